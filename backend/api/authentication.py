@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from foodgram.caches import LRUCache
+from users.models import User
+
+# Поля пользователя, которых достаточно для обработки запроса. Остальные
+# поля у восстановленного объекта отложены: при обращении к ним Django
+# дочитает их из БД, а save() сохранит только загруженные поля.
+# Порядок совпадает с порядком столбцов модели, как того требует from_db.
+USER_SNAPSHOT_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in {
+        "id",
+        "username",
+        "email",
+        "first_name",
+        "last_name",
+        "avatar",
+        "is_active",
+        "is_staff",
+        "is_superuser",
+    }
+)
+
+
+class TokenCache:
+    """Кэш «токен -> снимок пользователя».
+
+    Первый уровень живёт в памяти процесса, второй (необязательный) —
+    в общем кэше Django, доступном всем воркерам. Отзыв токена в другом
+    воркере вступает в силу не позже, чем через TTL локального уровня.
+    """
+
+    def __init__(self, options):
+        self.local = LRUCache(options["MAX_SIZE"], options["TTL"])
+        self.shared_alias = options.get("SHARED_ALIAS")
+        self.shared_ttl = options.get("SHARED_TTL", options["TTL"])
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias] if self.shared_alias else None
+
+    @staticmethod
+    def _shared_key(key):
+        return f"auth:token:{key}"
+
+    def get(self, key):
+        snapshot = self.local.get(key)
+        if snapshot is None and self.shared is not None:
+            snapshot = self.shared.get(self._shared_key(key))
+            if snapshot is not None:
+                self.local.set(key, snapshot)
+        return snapshot
+
+    def set(self, key, snapshot):
+        self.local.set(key, snapshot)
+        if self.shared is not None:
+            self.shared.set(self._shared_key(key), snapshot, self.shared_ttl)
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self.local.delete(key)
+        if self.shared is not None and keys:
+            self.shared.delete_many([self._shared_key(key) for key in keys])
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE)
+
+
+def make_snapshot(user):
+    """Значения полей в том виде, в каком они хранятся в столбцах таблицы."""
+    fields = [User._meta.get_field(name) for name in USER_SNAPSHOT_FIELDS]
+    return [
+        field.get_prep_value(field.value_from_object(user)) for field in fields
+    ]
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication без запроса к БД для уже известных токенов."""
+
+    def authenticate_credentials(self, key):
+        snapshot = token_cache.get(key)
+        if snapshot is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, make_snapshot(user))
+            return user, token
+
+        user = User.from_db(DEFAULT_DB_ALIAS, USER_SNAPSHOT_FIELDS, snapshot)
+        token = Token.from_db(
+            DEFAULT_DB_ALIAS, ("key", "user_id"), (key, user.id)
+        )
+        return user, token
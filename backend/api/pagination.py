@@ -1,5 +1,9 @@
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 from rest_framework.pagination import PageNumberPagination
-from foodgram.constants import PAGINATION_DEFAULT_LIMIT
+from foodgram.constants import (PAGINATION_DEFAULT_LIMIT,
+                                PAGINATION_ESTIMATED_COUNT_THRESHOLD)
+from foodgram.db.estimates import planner_count
 
 
 class CustomPageNumberPagination(PageNumberPagination):
@@ -13,4 +17,54 @@ class CustomPageNumberPagination(PageNumberPagination):
             'current_page': self.page.number,
             'total_pages': self.page.paginator.num_pages,
         })
-        return response
\ No newline at end of file
+        return response
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, берущий число строк большого списка из оценки планировщика.
+
+    COUNT(*) по большой таблице читает все подходящие строки на каждом
+    запросе страницы. Если планировщик оценивает список больше чем в
+    PAGINATION_ESTIMATED_COUNT_THRESHOLD строк, count берётся из оценки;
+    для небольших списков и не на PostgreSQL считается точное значение.
+    Оценка может ошибаться в обе стороны, поэтому страницы за её пределами
+    не отклоняются, а последняя страница не обрезается до count.
+    """
+
+    estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = planner_count(self.object_list)
+        if (estimate is not None
+                and estimate > PAGINATION_ESTIMATED_COUNT_THRESHOLD):
+            self.estimated = True
+            return estimate
+        return super().count
+
+    def validate_number(self, number):
+        # Номер за пределами оценки числа страниц не считается ошибкой
+        if self.count and self.estimated:
+            try:
+                number = int(number)
+            except (TypeError, ValueError):
+                pass
+            else:
+                if number > self.num_pages:
+                    return number
+        return super().validate_number(number)
+
+    def page(self, number):
+        if not (self.count and self.estimated):
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self
+        )
+
+
+class EstimatedCountPagination(CustomPageNumberPagination):
+    """Пагинация больших списков с оценкой числа строк вместо COUNT(*)."""
+
+    django_paginator_class = EstimatedCountPaginator
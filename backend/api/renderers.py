@@ -0,0 +1,43 @@
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+from rest_framework.renderers import JSONRenderer
+
+# DRF экранирует разделители строк, чтобы ответ оставался валидным JS
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson с тем же результатом побайтно.
+
+    Без установленного orjson, при запросе отступов и для значений,
+    которые orjson не поддерживает, используется обычный JSONRenderer.
+    Даты и время передаются кодировщику DRF, чтобы сохранить его формат.
+    """
+
+    options = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if orjson else None
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        if (
+            orjson is None
+            or data is None
+            or self.get_indent(accepted_media_type, renderer_context)
+            or not self.compact
+            or self.ensure_ascii
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=self.options
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
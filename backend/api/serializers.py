@@ -2,7 +2,8 @@ from djoser.serializers import UserCreateSerializer as DjoserUserCreateSerialize
 from rest_framework import serializers
 
 from api.fields import Base64ImageField
-from users.models import User, Follow
+from foodgram import membership
+from users.models import User
 
 # ИЗМЕНЕНО: класс переименован для избежания конфликта
 class UserReadSerializer(serializers.ModelSerializer):
@@ -27,10 +28,13 @@ class UserReadSerializer(serializers.ModelSerializer):
 
     def get_is_subscribed(self, obj):
         """Проверяет, подписан ли текущий пользователь на данного пользователя."""
-        request = self.context.get("request")
-        if not request or not request.user.is_authenticated:
-            return False
-        return Follow.objects.filter(follower=request.user, author=obj).exists()
+        # Значение, известное представлению заранее (например, в списке
+        # подписок), берётся из queryset, остальные — из индекса подписок
+        if hasattr(obj, "is_subscribed"):
+            return obj.is_subscribed
+        return obj.pk in membership.follows.for_request(
+            self.context.get("request")
+        )
 
 
 class CustomUserCreateSerializer(DjoserUserCreateSerializer):
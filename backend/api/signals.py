@@ -0,0 +1,29 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.authentication import token_cache
+from foodgram.constants import USER_ME_CACHE_KEY
+from users.models import User
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Выход (djoser logout удаляет токен) сразу отзывает кэш."""
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, update_fields, **kwargs):
+    """Смена пароля, деактивация и правка профиля обновляют снимок."""
+    if created or update_fields == frozenset({"last_login"}):
+        return
+    token_cache.invalidate(
+        *Token.objects.filter(user=instance).values_list("key", flat=True)
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_current_user_snapshot(sender, instance, **kwargs):
+    cache.delete(USER_ME_CACHE_KEY.format(instance.pk))
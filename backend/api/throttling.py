@@ -0,0 +1,156 @@
+"""Ограничение частоты запросов по алгоритму token bucket.
+
+У каждого ключа (область + пользователь или IP) есть корзина ёмкостью
+в N токенов, которая пополняется со скоростью N за период. Запрос забирает
+токен; если токенов нет, клиент получает 429 и заголовок Retry-After.
+Корзины хранятся в памяти воркера; при заданном THROTTLE["SHARED_ALIAS"]
+они общие для всех воркеров через кэш Django. Чтение и запись в кэш не
+атомарны, поэтому под конкурентной нагрузкой лимит соблюдается приближённо.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'10/min' -> (ёмкость корзины, токенов в секунду)."""
+    num, period = rate.split("/")
+    return int(num), int(num) / PERIODS[period[0]]
+
+
+def refill(state, capacity, rate, now):
+    """Забирает токен; возвращает новое состояние и время ожидания."""
+    tokens, updated = state if state else (capacity, now)
+    tokens = min(capacity, tokens + max(0, now - updated) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / rate
+
+
+class TokenBucketStore:
+    """Корзины в памяти процесса, не больше max_size ключей (LRU)."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        with self._lock:
+            state, wait = refill(
+                self._buckets.pop(key, None), capacity, rate, time.monotonic()
+            )
+            self._buckets[key] = state
+            if len(self._buckets) > self.max_size:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SharedTokenBucketStore:
+    """Корзины в общем кэше Django."""
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def consume(self, key, capacity, rate):
+        cache = caches[self.alias]
+        key = f"throttle:{key}"
+        state, wait = refill(cache.get(key), capacity, rate, time.time())
+        # Полная корзина ничем не отличается от отсутствующей
+        cache.set(key, state, math.ceil(capacity / rate) + 1)
+        return wait
+
+
+local_buckets = TokenBucketStore(settings.THROTTLE["MAX_SIZE"])
+
+
+def get_bucket_store():
+    alias = settings.THROTTLE["SHARED_ALIAS"]
+    return SharedTokenBucketStore(alias) if alias else local_buckets
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Базовый throttle; подкласс определяет область запроса.
+
+    Лимиты берутся из REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] в формате
+    DRF ("10/min"); области без лимита не ограничиваются.
+    """
+
+    scope = None
+
+    def __init__(self):
+        self.wait_seconds = 0
+
+    def get_scope(self, request, view):
+        return self.scope
+
+    def get_key(self, request, scope):
+        if request.user and request.user.is_authenticated:
+            return f"{scope}:user:{request.user.pk}"
+        return f"{scope}:ip:{self.get_ident(request)}"
+
+    def allow_request(self, request, view):
+        if not settings.THROTTLE["ENABLED"]:
+            return True
+        scope = self.get_scope(request, view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope) if scope else None
+        if not rate:
+            return True
+        capacity, refill_rate = parse_rate(rate)
+        self.wait_seconds = get_bucket_store().consume(
+            self.get_key(request, scope), capacity, refill_rate
+        )
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonTokenBucketThrottle(TokenBucketThrottle):
+    """Общий лимит анонимного клиента по IP."""
+
+    def get_scope(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return "anon"
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Общий лимит пользователя на все эндпоинты."""
+
+    def get_scope(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return "user"
+        return None
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """Лимит отдельного эндпоинта.
+
+    Область задаётся атрибутом представления throttle_scope, в том числе
+    через @action(throttle_scope=...), или словарём throttle_scopes
+    «действие -> область» для стандартных действий вьюсета.
+    """
+
+    def get_scope(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        if scope is None:
+            scope = getattr(view, "throttle_scopes", {}).get(
+                getattr(view, "action", None)
+            )
+        return scope
@@ -1,20 +1,31 @@
 # api/urls.py
 
+from django.conf import settings
 from django.urls import include, path
 from rest_framework import routers
 
-from api.views import CustomUserViewSet
-from recipes.views import IngredientViewSet, RecipeViewSet
+from api.views import CustomUserViewSet, DatabasePoolStatsView
+from recipes.views import (IngredientViewSet, RecipeViewSet,
+                           ingredient_detail, ingredient_list)
 
 router = routers.DefaultRouter()
 router.register("ingredients", IngredientViewSet, basename="ingredients")
 router.register("recipes", RecipeViewSet, basename="recipes")
 router.register("users", CustomUserViewSet, basename="users")
 
-urlpatterns = [
+urlpatterns = []
+if settings.ASYNC_READ_VIEWS:
+    # Асинхронные представления перекрывают маршруты роутера
+    urlpatterns += [
+        path("ingredients/", ingredient_list),
+        path("ingredients/<int:pk>/", ingredient_detail),
+    ]
+
+urlpatterns += [
     path("", include(router.urls)),
     path("", include("djoser.urls")),
     path("auth/", include('djoser.urls.authtoken')),
+    path("metrics/db-pool/", DatabasePoolStatsView.as_view(), name="db-pool-stats"),
     path(
         "users/<int:id>/subscribe/",
         CustomUserViewSet.as_view({'post': 'subscribe', 'delete': 'subscribe'}),
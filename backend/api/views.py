@@ -1,21 +1,38 @@
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+from django.db.models import Prefetch, Value
+from django.http import StreamingHttpResponse
 from djoser.views import UserViewSet
 from rest_framework import status, permissions
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 
-from api.pagination import CustomPageNumberPagination
+from api.pagination import EstimatedCountPagination
+from api.renderers import FastJSONRenderer
 from api.serializers import (UserReadSerializer, CustomUserCreateSerializer, 
                              SetAvatarSerializer, UserCreateResponseSerializer)
+from foodgram.caches import is_shared
+from foodgram.constants import (SUBSCRIPTION_STREAM_CHUNK_SIZE,
+                                USER_ME_CACHE_KEY, USER_ME_CACHE_TTL)
+from foodgram.db.expressions import count_subquery
+from foodgram.db.pool import pool_stats
+from recipes.jobs import delete_files_later
+from recipes.models import Recipe
+from users.jobs import delete_account
 from users.models import Follow, User
-from users.serializers import UserWithRecipesSerializer, SubscribeSerializer
+from users.serializers import (UserWithRecipesSerializer, SubscribeSerializer,
+                               get_recipes_limit)
 
 
 class CustomUserViewSet(UserViewSet):
-    queryset = User.objects.all()
-    pagination_class = CustomPageNumberPagination
+    queryset = User.objects.filter(deleted_at__isnull=True)
+    pagination_class = EstimatedCountPagination
     permission_classes = (AllowAny,) # Позволяем чтение всем
+    replica_actions = ("list",)
+    # Лимит эндпоинта задаётся в @action(throttle_scope=...)
+    throttle_scope = None
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -23,7 +40,10 @@ class CustomUserViewSet(UserViewSet):
         # ИЗМЕНЕНО: Для подписок используется UserWithRecipesSerializer
         if self.action == 'subscriptions':
             return UserWithRecipesSerializer
-        return UserReadSerializer
+        if self.action in ('list', 'retrieve', 'get_current_user'):
+            return UserReadSerializer
+        # Остальные действия djoser (set_password и т.п.) со своими сериализаторами
+        return super().get_serializer_class()
 
     @action(
         methods=['get'],
@@ -32,8 +52,21 @@ class CustomUserViewSet(UserViewSet):
         url_path='me'
     )
     def get_current_user(self, request):
-        serializer = UserReadSerializer(request.user, context={'request': request})
-        return Response(serializer.data)
+        # Снимок профиля кэшируется по пользователю и адресу сайта (от него
+        # зависит ссылка на аватар) и сбрасывается при сохранении пользователя.
+        # Сброс виден другим воркерам только через общий кэш
+        if not is_shared(DEFAULT_CACHE_ALIAS):
+            return Response(UserReadSerializer(
+                request.user, context={'request': request}
+            ).data)
+        key = USER_ME_CACHE_KEY.format(request.user.pk)
+        base_uri = request.build_absolute_uri('/')
+        snapshots = cache.get(key) or {}
+        if base_uri not in snapshots:
+            serializer = UserReadSerializer(request.user, context={'request': request})
+            snapshots[base_uri] = dict(serializer.data)
+            cache.set(key, snapshots, USER_ME_CACHE_TTL)
+        return Response(snapshots[base_uri])
 
     @action(
         methods=['put', 'delete'],
@@ -43,14 +76,20 @@ class CustomUserViewSet(UserViewSet):
     )
     def manage_avatar(self, request):
         user = request.user
+        # Файл может быть общим с другими записями, поэтому старый аватар
+        # удаляет фоновая задача после проверки ссылок на него
+        old_avatar = user.avatar.name
         if request.method == 'PUT':
             serializer = SetAvatarSerializer(user, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             serializer.save()
+            if user.avatar.name != old_avatar:
+                delete_files_later(old_avatar)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
-        user.avatar.delete()
+        user.avatar = None
         user.save()
+        delete_files_later(old_avatar)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -58,14 +97,56 @@ class CustomUserViewSet(UserViewSet):
         detail=False,
         permission_classes=[IsAuthenticated],
         # ИЗМЕНЕНО: url_path соответствует спецификации
-        url_path='subscriptions'
+        url_path='subscriptions',
+        throttle_scope='subscriptions',
     )
     def subscriptions(self, request):
-        followed_users = User.objects.filter(followers__follower=request.user)
+        # Рецепты всех авторов страницы загружаются одним запросом
+        # с ограничением по recipes_limit для каждого автора
+        limit = get_recipes_limit(request)
+        followed_users = User.objects.filter(
+            creator_subscriptions__follower=request.user,
+            deleted_at__isnull=True,
+        ).annotate(
+            is_subscribed=Value(True),
+            recipes_total=count_subquery(Recipe.objects.all(), 'author'),
+        ).prefetch_related(Prefetch(
+            'recipes',
+            queryset=(
+                Recipe.objects.order_by('-publication_date')[:limit]
+                if limit else Recipe.objects.none()
+            ),
+            to_attr='limited_recipes',
+        ))
+        context = {**self.get_serializer_context(), 'recipes_limit': limit}
+        if request.query_params.get('stream') in ('1', 'true'):
+            return self._stream_subscriptions(followed_users, context)
         page = self.paginate_queryset(followed_users)
-        serializer = self.get_serializer(page, many=True, context={'request': request})
+        serializer = self.get_serializer(page, many=True, context=context)
         return self.get_paginated_response(serializer.data)
 
+    def _stream_subscriptions(self, queryset, context):
+        """Все подписки одним ответом, сериализуемым по частям.
+
+        Авторы читаются порциями по SUBSCRIPTION_STREAM_CHUNK_SIZE вместе
+        со своими рецептами, поэтому память не зависит от числа подписок.
+        """
+        renderer = FastJSONRenderer()
+        count = queryset.count()
+
+        def chunks():
+            yield b'{"count":%d,"next":null,"previous":null,"results":[' % count
+            separator = b''
+            for user in queryset.iterator(
+                chunk_size=SUBSCRIPTION_STREAM_CHUNK_SIZE
+            ):
+                data = UserWithRecipesSerializer(user, context=context).data
+                yield separator + renderer.render(data)
+                separator = b','
+            yield b']}'
+
+        return StreamingHttpResponse(chunks(), content_type='application/json')
+
     @action(
         methods=['post', 'delete'],
         detail=True,
@@ -73,24 +154,31 @@ class CustomUserViewSet(UserViewSet):
         url_path='subscribe'
     )
     def subscribe(self, request, id=None):
-        author = get_object_or_404(User, id=id)
+        author = get_object_or_404(self.queryset, id=id)
 
         if request.method == 'POST':
             serializer = SubscribeSerializer(
                 data={'follower': request.user.id, 'author': author.id},
-                context={'request': request}
+                context={
+                    'request': request,
+                    'recipes_limit': get_recipes_limit(request),
+                }
             )
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         
 
-        subscription = User.objects.filter(creator_subscriptions__follower=request.user)
+        subscription = Follow.objects.filter(follower=request.user, author=author)
         if not subscription.exists():
             return Response({'errors': 'Вы не были подписаны на этого пользователя.'}, status=status.HTTP_400_BAD_REQUEST)
         subscription.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
     
+    def perform_destroy(self, instance):
+        # Аккаунт скрывается сразу, данные удаляются фоновой задачей
+        delete_account(instance)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -103,6 +191,15 @@ class CustomUserViewSet(UserViewSet):
         )
 
 
+class DatabasePoolStatsView(APIView):
+    """Метрики пула соединений текущего процесса."""
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(pool_stats())
+
+
 class IsOwnerOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
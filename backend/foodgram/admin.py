@@ -0,0 +1,100 @@
+"""Общие средства для админки больших таблиц."""
+
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from foodgram.constants import ADMIN_ESTIMATED_COUNT_THRESHOLD
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, берущий число строк нефильтрованной таблицы из статистики.
+
+    На PostgreSQL COUNT(*) по большой таблице читает её целиком, поэтому
+    для списка без фильтров используется оценка планировщика (pg_class),
+    если она больше ADMIN_ESTIMATED_COUNT_THRESHOLD. Для фильтрованных
+    списков и небольших таблиц считается точное значение.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return int(row[0])
+        return super().count
+
+
+class AutocompleteFilter(admin.SimpleListFilter):
+    """Фильтр по внешнему ключу с поиском вместо списка всех объектов.
+
+    Использует виджет автодополнения админки, поэтому в админке связанной
+    модели должны быть заданы search_fields. Подкласс задаёт title и
+    field_name.
+    """
+
+    template = "admin/autocomplete_filter.html"
+    field_name = None
+
+    def __init__(self, request, params, model, model_admin):
+        self.parameter_name = f"{self.field_name}__id__exact"
+        super().__init__(request, params, model, model_admin)
+        db_field = model._meta.get_field(self.field_name)
+        self.form_field = forms.ModelChoiceField(
+            queryset=db_field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(db_field, model_admin.admin_site),
+            required=False,
+        )
+
+    def has_output(self):
+        return True
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(
+                remove=[self.parameter_name]
+            ),
+            "display": "Все",
+        }
+
+    def rendered_widget(self):
+        return self.form_field.widget.render(
+            self.parameter_name,
+            self.value(),
+            attrs={"id": f"filter_{self.parameter_name}"},
+        )
+
+
+class LargeTableAdminMixin:
+    """Настройки списка для таблиц с миллионами строк."""
+
+    paginator = EstimatedCountPaginator
+    # Иначе при фильтрации выполняется второй COUNT(*) по всей таблице
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        media = super().media
+        for spec in getattr(self, "list_filter", ()):
+            if isinstance(spec, type) and issubclass(spec, AutocompleteFilter):
+                return media + AutocompleteSelect(None, None).media
+        return media
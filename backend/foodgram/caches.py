@@ -0,0 +1,57 @@
+# foodgram/caches.py
+
+"""Кэши процесса и проверка того, что кэш Django общий для всех процессов."""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared(alias):
+    """Видят ли записи кэша alias все воркеры, а не только текущий.
+
+    LocMemCache живёт в памяти процесса: сброс записи в одном воркере
+    не виден в остальных, и данные, которые сбрасываются при изменении,
+    в таком кэше хранить нельзя.
+    """
+    return not isinstance(caches[alias], LocMemCache)
+
+
+class LRUCache:
+    """Ограниченный по размеру потокобезопасный LRU-кэш со сроком жизни."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
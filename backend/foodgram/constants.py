@@ -1,5 +1,8 @@
 # Настройки пагинации
 PAGINATION_DEFAULT_LIMIT = 6
+# Списки, в которых больше строк, показывают оценку числа строк вместо
+# точного COUNT(*)
+PAGINATION_ESTIMATED_COUNT_THRESHOLD = 100_000
 
 # Ограничения для ингредиентов
 INGREDIENT_TITLE_MAX_LEN = 128
@@ -18,4 +21,72 @@ USER_USERNAME_MAX_LEN = 150
 USERNAME_VALIDATION_REGEX = r"(?!me\b)(^[\w.@+-]+\Z)"
 USER_FIRST_NAME_MAX_LEN = 150
 USER_LAST_NAME_MAX_LEN = 150
-USER_AVATAR_STORAGE_PATH = "users/"
\ No newline at end of file
+USER_AVATAR_STORAGE_PATH = "users/"
+
+# Кэширование
+USER_ME_CACHE_KEY = "users:me:{}"
+USER_ME_CACHE_TTL = 300
+
+# Пакетное получение рецептов
+RECIPE_BATCH_MAX_SIZE = 100
+
+# Короткие ссылки
+SHORT_LINK_CACHE_SIZE = 10000
+SHORT_LINK_CACHE_TTL = 3600
+SHORT_LINK_FLUSH_SIZE = 100
+SHORT_LINK_FLUSH_INTERVAL = 30
+
+# Фоновые задачи
+JOB_QUEUE_MAX_LEN = 64
+JOB_NAME_MAX_LEN = 255
+JOB_ERROR_MAX_LEN = 10000
+# Попытки записать результат задачи и пауза перед первым повтором (с),
+# которая удваивается с каждой попыткой
+JOB_FINISH_ATTEMPTS = 5
+JOB_FINISH_RETRY_DELAY = 0.1
+
+# Медиафайлы: сколько секунд после сохранения файл не удаляется, даже
+# если на него ещё нет ссылок
+MEDIA_DELETE_GRACE_SECONDS = 600
+
+# Удаление аккаунтов
+USER_PURGE_BATCH_SIZE = 500
+
+# Админка
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100_000
+
+# Рецепты авторов в подписках
+SUBSCRIPTION_RECIPES_LIMIT_DEFAULT = 10
+SUBSCRIPTION_RECIPES_LIMIT_MAX = 100
+SUBSCRIPTION_STREAM_CHUNK_SIZE = 100
+
+# Секционирование и архивация таблиц связей
+RELATION_PARTITIONS = 16
+SHOPPING_CART_ARCHIVE_AFTER_DAYS = 180
+SHOPPING_CART_ARCHIVE_BATCH_SIZE = 1000
+
+# Индексы принадлежности (избранное, список покупок, подписки)
+MEMBERSHIP_CACHE_SIZE = 10000
+MEMBERSHIP_CACHE_TTL = 600
+
+# Импорт и экспорт рецептов в NDJSON
+RECIPE_NDJSON_CHUNK_SIZE = 1000
+
+# План питания
+MEAL_PLAN_MAX_RECIPES = 500
+MEAL_PLAN_MAX_SERVINGS = 100
+MEAL_PLAN_CACHE_KEY = "meal_plan:{}"
+MEAL_PLAN_CACHE_TTL = 3600
+
+# События об изменении данных
+EVENTS_VERSION_KEY = "events:version:{}"
+EVENTS_SEQUENCE_KEY = "events:sequence"
+EVENTS_LOG_KEY = "events:log:{}"
+EVENTS_LOG_SIZE = 1000
+EVENTS_LOG_TTL = 3600
+
+# Нечёткий поиск ингредиентов
+INGREDIENT_FUZZY_MIN_LENGTH = 4
+INGREDIENT_FUZZY_TWO_TYPOS_LENGTH = 8
+INGREDIENT_FUZZY_EXACT_PREFIX_LEN = 1
+INGREDIENT_FUZZY_LIMIT = 20
@@ -0,0 +1,28 @@
+"""Массовая запись строк, общая для генератора данных и импорта."""
+
+import csv
+import io
+
+from django.db import connection
+
+
+def copy_rows(model, field_names, rows):
+    """Записывает кортежи значений полей в таблицу модели через COPY.
+
+    Только для PostgreSQL: COPY в разы быстрее многострочного INSERT,
+    потому что строки не проходят через ORM и не разбираются как SQL.
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    columns = ', '.join(
+        connection.ops.quote_name(field.column) for field in fields
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(model._meta.db_table)} '
+            f'({columns}) FROM STDIN WITH (FORMAT csv)',
+            buffer,
+        )
+    return len(rows)
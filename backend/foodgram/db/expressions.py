@@ -0,0 +1,23 @@
+"""Выражения ORM, общие для API и админки."""
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(queryset, field="pk"):
+    """Коррелированный подзапрос с числом строк queryset для OuterRef(field).
+
+    В отличие от Count через JOIN считается только для строк текущей
+    страницы и не требует GROUP BY по всей таблице.
+    """
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("*"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
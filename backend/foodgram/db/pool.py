@@ -0,0 +1,159 @@
+"""Пул соединений с базой данных внутри процесса."""
+
+import os
+import threading
+import time
+from collections import deque
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Потокобезопасный пул с верхней границей и временем простоя.
+
+    Сверх max_size пул может открыть ещё max_overflow соединений; такие
+    соединения закрываются при возврате, если в пуле уже нет места.
+    Когда все соединения заняты, вызывающий поток ждёт освобождения
+    не дольше timeout секунд.
+    """
+
+    def __init__(self, *, max_size, max_overflow, timeout, idle_timeout,
+                 error_class):
+        self.max_size = max_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.error_class = error_class
+        self.pid = os.getpid()
+        self._idle = deque()
+        self._in_use = 0
+        self._condition = threading.Condition()
+        self._stats = {
+            'created': 0,
+            'closed': 0,
+            'acquired': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'timeouts': 0,
+        }
+
+    def _close(self, connection):
+        self._stats['closed'] += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _check_fork(self):
+        # Соединения родительского процесса нельзя использовать после fork
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self._idle.clear()
+            self._in_use = 0
+
+    def _prune_idle(self):
+        deadline = time.monotonic() - self.idle_timeout
+        while self._idle and self._idle[0][1] < deadline:
+            self._close(self._idle.popleft()[0])
+
+    def acquire(self, connect):
+        """Выдаёт свободное соединение или открывает новое через connect()."""
+        started = time.monotonic()
+        waited = False
+        with self._condition:
+            self._check_fork()
+            while True:
+                self._prune_idle()
+                while self._idle:
+                    connection, _ = self._idle.pop()
+                    if not connection.closed:
+                        self._in_use += 1
+                        self._stats['acquired'] += 1
+                        self._record_wait(started, waited)
+                        return connection
+                    self._stats['closed'] += 1
+                if self._in_use < self.max_size + self.max_overflow:
+                    self._in_use += 1
+                    break
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise self.error_class(
+                        'Не удалось получить соединение из пула за '
+                        f'{self.timeout} с'
+                    )
+                waited = True
+                self._condition.wait(remaining)
+            self._record_wait(started, waited)
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._stats['created'] += 1
+            self._stats['acquired'] += 1
+        return connection
+
+    def _record_wait(self, started, waited):
+        if not waited:
+            return
+        elapsed = time.monotonic() - started
+        self._stats['waits'] += 1
+        self._stats['wait_time_total'] += elapsed
+        self._stats['wait_time_max'] = max(
+            self._stats['wait_time_max'], elapsed
+        )
+
+    def release(self, connection, discard=False):
+        with self._condition:
+            if self.pid != os.getpid():
+                return
+            self._in_use -= 1
+            if discard or connection.closed or len(self._idle) >= self.max_size:
+                self._close(connection)
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            while self._idle:
+                self._close(self._idle.popleft()[0])
+
+    def stats(self):
+        with self._condition:
+            return {
+                **self._stats,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'overflow': max(0, self._in_use - self.max_size),
+                'max_size': self.max_size,
+                'max_overflow': self.max_overflow,
+            }
+
+
+def get_pool(alias, factory):
+    """Возвращает пул для псевдонима БД, создавая его при первом обращении."""
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = factory()
+        return _pools[alias]
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+def close_pools():
+    """Закрывает простаивающие соединения всех пулов (например, перед fork)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,43 @@
+"""PostgreSQL-бэкенд Django, берущий соединения из пула процесса."""
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from foodgram.db.pool import ConnectionPool, get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @property
+    def pool(self):
+        options = self.settings_dict.get("POOL", {})
+        return get_pool(self.alias, lambda: ConnectionPool(
+            max_size=options.get("MAX_SIZE", 10),
+            max_overflow=options.get("MAX_OVERFLOW", 5),
+            timeout=options.get("TIMEOUT", 10),
+            idle_timeout=options.get("IDLE_TIMEOUT", 300),
+            error_class=self.Database.OperationalError,
+        ))
+
+    def get_new_connection(self, conn_params):
+        return self.pool.acquire(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            )
+        )
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Соединение с незавершённой транзакцией или после ошибки
+        # не возвращаем в пул как есть
+        discard = self.errors_occurred
+        if not discard and (
+            self.connection.get_transaction_status()
+            != extensions.TRANSACTION_STATUS_IDLE
+        ):
+            try:
+                self.connection.rollback()
+            except self.Database.Error:
+                discard = True
+        self.pool.release(self.connection, discard=discard)
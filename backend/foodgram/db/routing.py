@@ -0,0 +1,94 @@
+"""Маршрутизация чтения на реплики базы данных.
+
+Безопасные запросы (GET, HEAD) к помеченным представлениям читают
+из реплик; всё остальное идёт в основную базу. После успешной записи
+клиент получает cookie, и в течение DATABASE_REPLICA_STICKY_SECONDS
+его запросы читают из основной базы, чтобы видеть собственные изменения.
+"""
+
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+STICKY_COOKIE = "primary_until"
+STICKY_HEADER = "HTTP_X_READ_PRIMARY"
+READ_METHODS = ("GET", "HEAD")
+
+
+def replica_read(view):
+    """Помечает функцию-представление как допускающую чтение из реплики."""
+    view.replica_read = True
+    return view
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+class ReplicaRoutingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _read_from_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+        if request.method not in READ_METHODS and response.status_code < 400:
+            window = settings.DATABASE_REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(int(time.time() + window)),
+                max_age=window,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method in READ_METHODS
+            and self.allows_replica(request, view_func)
+            and not self.is_sticky(request)
+        ):
+            _read_from_replica.set(True)
+
+    @staticmethod
+    def allows_replica(request, view_func):
+        if getattr(view_func, "replica_read", False):
+            return True
+        # ViewSet.as_view() сохраняет класс и соответствие методов действиям
+        view_class = getattr(view_func, "cls", None)
+        actions = getattr(view_func, "actions", None) or {}
+        action = actions.get(request.method.lower())
+        return action in getattr(view_class, "replica_actions", ())
+
+    @staticmethod
+    def is_sticky(request):
+        if request.META.get(STICKY_HEADER):
+            return True
+        try:
+            return int(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
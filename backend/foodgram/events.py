@@ -0,0 +1,273 @@
+# foodgram/events.py
+
+"""События об изменении данных для сброса кэшей во всех процессах.
+
+Изменение публикуется как пара «сущность, ключ» (например, ("favorite",
+id пользователя)). События одной транзакции копятся и после её фиксации
+обрабатываются разом:
+
+* меняются метки версий сущности и каждого ключа в общем кэше, так что
+  version() из любого процесса за один запрос к кэшу узнаёт об изменении;
+* вызываются подписчики этого процесса;
+* пакет событий дописывается в журнал в общем кэше, из которого
+  EventSyncMiddleware доставляет его подписчикам остальных процессов.
+
+Модели из track() публикуют события сигналами, а массовые операции,
+которые сигналов не отправляют (bulk_create, COPY, update), вызывают
+publish() сами. Для работы между процессами кэш EVENTS_CACHE_ALIAS
+должен быть общим (Redis, Memcached), а не LocMemCache.
+"""
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+
+from foodgram.constants import (EVENTS_LOG_KEY, EVENTS_LOG_SIZE,
+                                EVENTS_LOG_TTL, EVENTS_SEQUENCE_KEY,
+                                EVENTS_VERSION_KEY)
+
+logger = logging.getLogger(__name__)
+
+# Сущности, об изменении которых публикуются события
+RECIPE = "recipe"
+RECIPE_INGREDIENT = "recipe_ingredient"
+INGREDIENT = "ingredient"
+FAVORITE = "favorite"
+SHOPPING_CART = "shopping_cart"
+FOLLOW = "follow"
+USER = "user"
+USER_AVATAR = "user_avatar"
+
+# Ключ версии, который меняется при публикации без ключей
+ALL = "*"
+
+_subscribers = defaultdict(list)
+_sync_lock = threading.Lock()
+# Последний обработанный номер журнала; воркеры наследуют его от мастера
+_state = {"last_seen": None}
+
+
+def _cache():
+    return caches[settings.EVENTS_CACHE_ALIAS]
+
+
+def _origin():
+    # Вычисляется при каждом вызове: воркеры gunicorn — fork мастера
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _version_key(entity, key=None):
+    return EVENTS_VERSION_KEY.format(entity if key is None else
+                                     f"{entity}:{key}")
+
+
+def _stamps(cache_keys):
+    cache = _cache()
+    stamps = cache.get_many(cache_keys)
+    for cache_key in cache_keys:
+        if cache_key not in stamps:
+            cache.add(cache_key, uuid.uuid4().hex, None)
+            stamps[cache_key] = cache.get(cache_key)
+    return stamps
+
+
+def version(entity, key=None):
+    """Метка версии сущности или одного её ключа за один запрос к кэшу.
+
+    Версия сущности меняется при любом её изменении, версия ключа — при
+    изменении этого ключа и при публикации без ключей. Метки — случайные
+    строки: вытесненная из кэша метка заменяется новой и не совпадёт ни
+    с одной, сохранённой вместе с кэшированными данными.
+    """
+    if key is None:
+        return versions(entity)[entity]
+    cache_keys = (_version_key(entity, ALL), _version_key(entity, key))
+    stamps = _stamps(cache_keys)
+    return ":".join(stamps[cache_key] for cache_key in cache_keys)
+
+
+def versions(*entities):
+    """Метки версий нескольких сущностей одним запросом к кэшу."""
+    keys = {_version_key(entity): entity for entity in entities}
+    stamps = _stamps(list(keys))
+    return {entity: stamps[key] for key, entity in keys.items()}
+
+
+def subscribe(entity, callback):
+    """Подписывает callback(entity, keys) на изменения сущности.
+
+    keys — множество изменённых ключей или None, если изменилось что
+    угодно (публикация без ключей или потерянный журнал событий).
+    """
+    _subscribers[entity].append(callback)
+    return callback
+
+
+class PendingEvents:
+    """События текущей транзакции, обрабатываемые после её фиксации."""
+
+    def __init__(self):
+        self.events = {}
+
+    def add(self, entity, keys):
+        if not keys:
+            self.events[entity] = None
+        elif entity not in self.events:
+            self.events[entity] = set(keys)
+        elif self.events[entity] is not None:
+            self.events[entity].update(keys)
+
+    def __call__(self):
+        dispatch(self.events)
+
+
+def publish(entity, *keys):
+    """Публикует изменение ключей сущности после фиксации транзакции.
+
+    Без ключей считаются изменёнными все ключи сущности. Повторы внутри
+    транзакции схлопываются.
+    """
+    connection = transaction.get_connection()
+    pending = getattr(connection, "pending_events", None)
+    # Колбэк из откаченной транзакции Django уже выбросил
+    if pending is None or not any(
+        callback is pending for _, callback, _ in connection.run_on_commit
+    ):
+        pending = connection.pending_events = PendingEvents()
+        pending.add(entity, keys)
+        # Вне транзакции колбэк выполняется сразу
+        transaction.on_commit(pending)
+        return
+    pending.add(entity, keys)
+
+
+def dispatch(events):
+    """Меняет версии, пишет журнал и уведомляет подписчиков процесса."""
+    if not events:
+        return
+    cache = _cache()
+    stamp = uuid.uuid4().hex
+    stamps = {}
+    for entity, keys in events.items():
+        stamps[_version_key(entity)] = stamp
+        for key in (ALL,) if keys is None else keys:
+            stamps[_version_key(entity, key)] = stamp
+    cache.set_many(stamps, None)
+
+    cache.add(EVENTS_SEQUENCE_KEY, 0, None)
+    sequence = cache.incr(EVENTS_SEQUENCE_KEY)
+    cache.set(
+        EVENTS_LOG_KEY.format(sequence),
+        {"origin": _origin(),
+         "events": {entity: None if keys is None else sorted(keys)
+                    for entity, keys in events.items()}},
+        EVENTS_LOG_TTL,
+    )
+    _deliver(events)
+
+
+def _deliver(events):
+    for entity, keys in events.items():
+        for callback in _subscribers.get(entity, ()):
+            try:
+                callback(entity, keys)
+            except Exception:
+                logger.exception("Ошибка подписчика событий %s", entity)
+
+
+def _deliver_all():
+    _deliver({entity: None for entity in _subscribers})
+
+
+def sync():
+    """Доставляет подписчикам процесса события из других процессов.
+
+    Стоит одного запроса к кэшу, если новых событий нет. При разрыве в
+    журнале подписчики получают keys=None и сбрасывают всё.
+    """
+    cache = _cache()
+    # Пока событий не было, номер журнала считается нулевым
+    sequence = cache.get(EVENTS_SEQUENCE_KEY) or 0
+    with _sync_lock:
+        last_seen = _state["last_seen"]
+        if sequence == last_seen:
+            return
+        _state["last_seen"] = sequence
+    if last_seen is None:
+        # Первая синхронизация: кэши процесса построены уже после
+        # всех событий журнала
+        return
+    if sequence < last_seen or sequence - last_seen > EVENTS_LOG_SIZE:
+        _deliver_all()
+        return
+    keys = [EVENTS_LOG_KEY.format(number)
+            for number in range(last_seen + 1, sequence + 1)]
+    entries = cache.get_many(keys)
+    if len(entries) < len(keys):
+        _deliver_all()
+        return
+    origin = _origin()
+    for key in keys:
+        entry = entries[key]
+        if entry["origin"] != origin:
+            _deliver({
+                entity: None if entity_keys is None else set(entity_keys)
+                for entity, entity_keys in entry["events"].items()
+            })
+
+
+class EventSyncMiddleware:
+    """Перед обработкой запроса доставляет события других процессов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sync()
+        return self.get_response(request)
+
+
+def track(model, entity, key="pk"):
+    """Публикует (entity, instance.<key>) при сохранении и удалении модели."""
+
+    def changed(sender, instance, **kwargs):
+        publish(entity, getattr(instance, key))
+
+    uid = f"events_{model}_{entity}"
+    post_save.connect(changed, sender=model, dispatch_uid=f"{uid}_save",
+                      weak=False)
+    post_delete.connect(changed, sender=model, dispatch_uid=f"{uid}_delete",
+                        weak=False)
+
+
+def track_field(model, field, entity):
+    """Публикует (entity, pk), только если значение поля изменилось."""
+    attribute = f"_events_initial_{field}"
+
+    def loaded(sender, instance, **kwargs):
+        instance.__dict__[attribute] = instance.__dict__.get(field)
+
+    def saved(sender, instance, **kwargs):
+        value = instance.__dict__.get(field)
+        if str(value or "") != str(instance.__dict__.get(attribute) or ""):
+            publish(entity, instance.pk)
+        instance.__dict__[attribute] = value
+
+    def deleted(sender, instance, **kwargs):
+        publish(entity, instance.pk)
+
+    uid = f"events_{model}_{field}"
+    post_init.connect(loaded, sender=model, dispatch_uid=f"{uid}_init",
+                      weak=False)
+    post_save.connect(saved, sender=model, dispatch_uid=f"{uid}_save",
+                      weak=False)
+    post_delete.connect(deleted, sender=model, dispatch_uid=f"{uid}_delete",
+                        weak=False)
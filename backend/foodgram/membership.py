@@ -0,0 +1,109 @@
+# foodgram/membership.py
+
+"""Индексы принадлежности для проверок is_favorited, is_in_shopping_cart
+и is_subscribed.
+
+Для каждого пользователя хранится отсортированный массив id связанных
+объектов, поэтому проверка — двоичный поиск в памяти процесса без запроса
+к БД. Актуальность массива определяет метка версии пользователя из
+foodgram.events: изменение связи меняет метку, и массив лениво
+перестраивается при следующей проверке. Число пользователей в памяти
+ограничено LRU-кэшем. Метки должны лежать в общем кэше (Redis,
+Memcached); если EVENTS_CACHE_ALIAS указывает на кэш в памяти процесса,
+массивы не кэшируются и читаются из БД один раз за запрос.
+"""
+
+import bisect
+from array import array
+
+from django.apps import apps
+from django.conf import settings
+
+from foodgram import events
+from foodgram.caches import LRUCache, is_shared
+from foodgram.constants import MEMBERSHIP_CACHE_SIZE, MEMBERSHIP_CACHE_TTL
+
+
+class MembershipSet:
+    """Неизменяемое множество id на отсортированном массиве."""
+
+    __slots__ = ("ids",)
+
+    def __init__(self, ids):
+        self.ids = array("q", sorted(ids))
+
+    def __contains__(self, pk):
+        index = bisect.bisect_left(self.ids, pk)
+        return index < len(self.ids) and self.ids[index] == pk
+
+    def __len__(self):
+        return len(self.ids)
+
+
+EMPTY = MembershipSet(())
+
+
+class MembershipIndex:
+    """Множества id объектов, связанных с пользователем через модель связи."""
+
+    def __init__(self, name, model, user_field, target_field, entity):
+        self.name = name
+        self.model_label = model
+        self.user_field = user_field
+        self.target_field = target_field
+        self.entity = entity
+        self.sets = LRUCache(MEMBERSHIP_CACHE_SIZE, MEMBERSHIP_CACHE_TTL)
+        events.subscribe(entity, self._changed)
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def _load(self, user_id):
+        return MembershipSet(
+            self.model.objects.filter(
+                **{f"{self.user_field}_id": user_id}
+            ).values_list(f"{self.target_field}_id", flat=True)
+        )
+
+    def get(self, user_id):
+        """Множество id для пользователя, перестроенное при смене версии."""
+        if not is_shared(settings.EVENTS_CACHE_ALIAS):
+            # Метки версий в памяти процесса не меняются от записей других
+            # воркеров: множество читается из БД на каждый запрос
+            return self._load(user_id)
+        version = events.version(self.entity, user_id)
+        cached = self.sets.get(user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        # Версия прочитана до запроса: изменение, случившееся во время
+        # перестроения, сменит её и вызовет ещё одно перестроение
+        members = self._load(user_id)
+        self.sets.set(user_id, (version, members))
+        return members
+
+    def for_request(self, request):
+        """Множество текущего пользователя, общее для всего запроса."""
+        if request is None or not request.user.is_authenticated:
+            return EMPTY
+        memo = request.__dict__.setdefault("_membership", {})
+        if self.name not in memo:
+            memo[self.name] = self.get(request.user.pk)
+        return memo[self.name]
+
+    def _changed(self, entity, user_ids):
+        # Устаревший массив и так не пройдёт проверку версии, а удаление
+        # лишь освобождает память
+        if user_ids is None:
+            self.sets.clear()
+            return
+        for user_id in user_ids:
+            self.sets.delete(user_id)
+
+
+favorites = MembershipIndex("favorites", "recipes.FavoriteRecipe",
+                            "user", "recipe", events.FAVORITE)
+shopping_cart = MembershipIndex("shopping_cart", "recipes.ShoppingList",
+                                "user", "recipe", events.SHOPPING_CART)
+follows = MembershipIndex("follows", "users.Follow", "follower", "author",
+                          events.FOLLOW)
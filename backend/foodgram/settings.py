@@ -31,13 +31,16 @@ INSTALLED_APPS = [
     "api.apps.ApiConfig",
     "recipes.apps.RecipesConfig",
     "users.apps.UsersConfig",
+    "jobs.apps.JobsConfig",
     "django_filters",
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'foodgram.events.EventSyncMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'foodgram.db.routing.ReplicaRoutingMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -49,7 +52,7 @@ ROOT_URLCONF = 'foodgram.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        'DIRS': [BASE_DIR / "templates"],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -63,6 +66,11 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'foodgram.wsgi.application'
+ASGI_APPLICATION = 'foodgram.asgi.application'
+
+# Асинхронные версии читающих эндпоинтов; имеет смысл включать
+# при запуске через foodgram.asgi
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", default="false").lower() == "true"
 
 
 # Database
@@ -76,9 +84,65 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", default=None),
         "HOST": os.getenv("DB_HOST", default=None),
         "PORT": os.getenv("DB_PORT", default=None),
+        # Постоянные соединения: сколько секунд держать соединение открытым
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", default=60)),
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+
+# Пул соединений внутри процесса (только для PostgreSQL). Соединения
+# возвращаются в пул в конце запроса, поэтому CONN_MAX_AGE не нужен.
+DB_POOL_ENABLED = os.getenv("DB_POOL_ENABLED", default="false").lower() == "true"
+if DB_POOL_ENABLED and DATABASES["default"]["ENGINE"].endswith("postgresql"):
+    DATABASES["default"].update({
+        "ENGINE": "foodgram.db.postgresql_pool",
+        "CONN_MAX_AGE": 0,
+        "POOL": {
+            "MAX_SIZE": int(os.getenv("DB_POOL_MAX_SIZE", default=10)),
+            "MAX_OVERFLOW": int(os.getenv("DB_POOL_MAX_OVERFLOW", default=5)),
+            "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", default=10)),
+            "IDLE_TIMEOUT": float(os.getenv("DB_POOL_IDLE_TIMEOUT", default=300)),
+        },
+    })
+
+# Реплики для чтения: список через запятую. Для PostgreSQL элемент —
+# host[:port] реплики, для SQLite — путь к файлу базы.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, os.getenv(
+    "DB_REPLICAS", default=""
+).split(","))):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "TEST": {"MIRROR": "default"},
+    }
+    if DATABASES[alias]["ENGINE"].endswith("sqlite3"):
+        DATABASES[alias]["NAME"] = replica
+    else:
+        host, _, port = replica.strip().partition(":")
+        DATABASES[alias].update(HOST=host, PORT=port or DATABASES[alias]["PORT"])
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["foodgram.db.routing.ReplicaRouter"]
+# Сколько секунд после записи клиент читает из основной базы
+DATABASE_REPLICA_STICKY_SECONDS = int(
+    os.getenv("DB_REPLICA_STICKY_SECONDS", default=5)
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", default=""),
     }
 }
 
+# Кэш, через который процессы обмениваются событиями об изменении данных
+# (см. foodgram/events.py)
+EVENTS_CACHE_ALIAS = os.getenv("EVENTS_CACHE_ALIAS", default="default")
+
 AUTH_USER_MODEL = 'users.User'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -111,6 +175,16 @@ STATIC_ROOT = BASE_DIR / "static"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Медиафайлы хранятся по хешу содержимого, см. foodgram/storage.py
+STORAGES = {
+    "default": {
+        "BACKEND": "foodgram.storage.ContentAddressedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
@@ -118,8 +192,79 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
+    "DEFAULT_THROTTLE_CLASSES": [
+        "api.throttling.AnonTokenBucketThrottle",
+        "api.throttling.UserTokenBucketThrottle",
+        "api.throttling.ScopedTokenBucketThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": os.getenv("THROTTLE_RATE_ANON", default="600/min"),
+        "user": os.getenv("THROTTLE_RATE_USER", default="1200/min"),
+        "recipe_create": os.getenv(
+            "THROTTLE_RATE_RECIPE_CREATE", default="30/min"
+        ),
+        "shopping_cart_download": os.getenv(
+            "THROTTLE_RATE_SHOPPING_CART_DOWNLOAD", default="20/min"
+        ),
+        "subscriptions": os.getenv(
+            "THROTTLE_RATE_SUBSCRIPTIONS", default="60/min"
+        ),
+        "meal_plan": os.getenv("THROTTLE_RATE_MEAL_PLAN", default="60/min"),
+    },
+    # Число прокси перед приложением: IP клиента для лимитов берётся из
+    # X-Forwarded-For, который выставляет nginx, а не из REMOTE_ADDR прокси
+    "NUM_PROXIES": int(os.getenv("THROTTLE_NUM_PROXIES", default=1)),
+}
+
+# Корзины token bucket: в памяти воркера (не больше MAX_SIZE ключей) или,
+# если задан THROTTLE_SHARED_ALIAS, в общем кэше Django
+THROTTLE = {
+    "ENABLED": os.getenv("THROTTLE_ENABLED", default="true").lower() == "true",
+    "MAX_SIZE": int(os.getenv("THROTTLE_MAX_SIZE", default=100000)),
+    "SHARED_ALIAS": os.getenv("THROTTLE_SHARED_ALIAS", default=None),
+}
+
+# Кэш аутентификации по токену: локальный LRU в каждом воркере и,
+# если задан TOKEN_CACHE_SHARED_ALIAS, общий кэш Django.
+# Отозванный токен перестаёт работать не позже чем через TTL секунд.
+TOKEN_CACHE = {
+    "MAX_SIZE": int(os.getenv("TOKEN_CACHE_MAX_SIZE", default=10000)),
+    "TTL": int(os.getenv("TOKEN_CACHE_TTL", default=60)),
+    "SHARED_ALIAS": os.getenv("TOKEN_CACHE_SHARED_ALIAS", default=None),
+}
+
+# Фоновые задачи: очереди в формате "имя:потоки,имя:потоки",
+# время блокировки задачи, параметры экспоненциальной паузы между попытками
+# и удаление завершённых задач
+JOBS = {
+    "QUEUES": {
+        name: int(limit)
+        for name, limit in (
+            item.split(":")
+            for item in os.getenv(
+                "JOBS_QUEUES", default="default:4,files:2"
+            ).split(",")
+        )
+    },
+    "POLL_INTERVAL": float(os.getenv("JOBS_POLL_INTERVAL", default=1)),
+    "LOCK_TIMEOUT": int(os.getenv("JOBS_LOCK_TIMEOUT", default=300)),
+    "BACKOFF": int(os.getenv("JOBS_BACKOFF", default=5)),
+    "BACKOFF_MAX": int(os.getenv("JOBS_BACKOFF_MAX", default=3600)),
+    "CLEANUP_INTERVAL": int(
+        os.getenv("JOBS_CLEANUP_INTERVAL", default=3600)
+    ),
+    "CLEANUP_DAYS": int(os.getenv("JOBS_CLEANUP_DAYS", default=7)),
 }
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -0,0 +1,132 @@
+# foodgram/startup.py
+
+"""Прогрев приложения перед fork и замер времени запуска.
+
+gunicorn с preload_app загружает приложение в мастер-процессе и вызывает
+warm_up до запуска воркеров (см. gunicorn.conf.py). Всё, что построено
+при прогреве, воркеры получают готовым через fork, а не строят заново
+на первых запросах.
+"""
+
+import json
+import logging
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.urls import get_resolver
+
+from foodgram import events
+from foodgram.db.pool import close_pools
+
+logger = logging.getLogger(__name__)
+
+# Дополнительные шаги прогрева, которые регистрируют приложения
+warm_up_hooks = []
+
+# Загрузка приложения в отдельном процессе: печатает время в мс
+BOOT_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import django
+django.setup()
+from foodgram.wsgi import application
+loaded = time.perf_counter()
+warmed = loaded
+if {warm_up!r}:
+    from foodgram.startup import warm_up
+    warm_up()
+    warmed = time.perf_counter()
+print(json.dumps({{
+    "load_ms": (loaded - started) * 1000,
+    "warm_up_ms": (warmed - loaded) * 1000,
+}}))
+"""
+
+
+def on_warm_up(func):
+    """Декоратор, добавляющий функцию к шагам прогрева."""
+    warm_up_hooks.append(func)
+    return func
+
+
+def _import_serializers():
+    from api import serializers as api_serializers
+    from recipes import serializers as recipe_serializers
+    from rest_framework.serializers import ModelSerializer
+    from users import serializers as user_serializers
+
+    for module in (api_serializers, recipe_serializers, user_serializers):
+        for value in vars(module).values():
+            if (isinstance(value, type) and issubclass(value, ModelSerializer)
+                    and value.__module__ == module.__name__
+                    and hasattr(getattr(value, "Meta", None), "model")):
+                yield value
+
+
+def warm_up():
+    """Строит ленивые структуры приложения; возвращает время в секундах.
+
+    Собирается дерево URL, поля ModelSerializer (и вместе с ними кэши
+    _meta моделей), подгружается Pillow, а каталог ингредиентов один раз
+    запрашивается через весь стек middleware. Номер журнала событий
+    запоминается до прогрева: воркеры унаследуют его и получат все
+    изменения, случившиеся после. В конце закрываются соединения с БД:
+    открытые сокеты нельзя делить между воркерами.
+    """
+    started = time.perf_counter()
+    try:
+        events.sync()
+        get_resolver().url_patterns
+        for serializer_class in _import_serializers():
+            serializer_class().fields
+        from PIL import Image
+
+        Image.init()
+        Client(raise_request_exception=False, SERVER_NAME="localhost").get(
+            "/api/ingredients/", {"name": "а"}
+        )
+        for hook in warm_up_hooks:
+            hook()
+    finally:
+        connections.close_all()
+        close_pools()
+    elapsed = time.perf_counter() - started
+    logger.info("Прогрев приложения занял %.0f мс", elapsed * 1000)
+    return elapsed
+
+
+def measure_boot(warm_up=True, import_time=False):
+    """Загружает приложение в новом процессе и возвращает замеры.
+
+    С import_time=True добавляется вывод python -X importtime
+    (поле importtime) для разбора самых медленных импортов.
+    """
+    command = [sys.executable]
+    if import_time:
+        command += ["-X", "importtime"]
+    command += ["-c", BOOT_SCRIPT.format(warm_up=warm_up)]
+    started = time.perf_counter()
+    result = subprocess.run(
+        command, capture_output=True, text=True, check=True,
+        cwd=settings.BASE_DIR,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["process_ms"] = (time.perf_counter() - started) * 1000
+    if import_time:
+        report["importtime"] = parse_import_time(result.stderr)
+    return report
+
+
+def parse_import_time(output):
+    """Строки -X importtime в кортежи (модуль, своё время, общее время, мкс)."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
@@ -0,0 +1,103 @@
+# foodgram/storage.py
+
+"""Хранилище медиафайлов с адресацией по содержимому.
+
+Имя файла — SHA-256 его содержимого, поэтому одинаковые изображения
+записываются один раз, а повторное сохранение неизменённой картинки не
+пишет на диск ничего. Файл может быть общим для нескольких записей:
+его удаляют только тогда, когда на него не ссылается ни одно поле из
+REFERENCES (счётчик ссылок вычисляется по БД в момент удаления и не
+расходится с данными).
+
+Повторное сохранение уже существующего файла обновляет время его
+изменения, а файлы, изменённые меньше MEDIA_DELETE_GRACE_SECONDS назад,
+не удаляются: запись, которая на них сошлётся, могла ещё не
+зафиксироваться.
+"""
+
+import hashlib
+import os
+import time
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+
+from foodgram.constants import MEDIA_DELETE_GRACE_SECONDS
+
+# Поля моделей, которые ссылаются на файлы хранилища
+REFERENCES = (
+    ("recipes.Recipe", "image"),
+    ("users.User", "avatar"),
+)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Файловое хранилище, раскладывающее файлы по хешу содержимого.
+
+    Файл recipes/photo.png сохраняется как recipes/ab/abcd….png: каталог
+    из upload_to и расширение сохраняются, первые два символа хеша
+    ограничивают число файлов в одном каталоге.
+    """
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, "seek"):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, "seek"):
+            content.seek(0)
+        digest = digest.hexdigest()
+        directory, file_name = os.path.split(name)
+        extension = os.path.splitext(file_name)[1].lower()
+        return os.path.join(directory, digest[:2], f"{digest}{extension}")
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        # Тот же хеш — то же содержимое: запись не нужна, но время
+        # изменения отмечает, что файл снова используется
+        if self.exists(name):
+            try:
+                os.utime(self.path(name))
+                return name
+            except FileNotFoundError:
+                # Файл удалили между проверкой и отметкой
+                pass
+        return super().save(name, content, max_length=max_length)
+
+
+def is_referenced(name):
+    """Ссылается ли на файл хотя бы одна запись."""
+    return any(
+        apps.get_model(label).objects.filter(**{field: name}).exists()
+        for label, field in REFERENCES
+    )
+
+
+def is_recently_used(name, storage=default_storage):
+    """Сохранялся ли файл меньше MEDIA_DELETE_GRACE_SECONDS назад."""
+    try:
+        modified = os.path.getmtime(storage.path(name))
+    except FileNotFoundError:
+        return False
+    return time.time() - modified < MEDIA_DELETE_GRACE_SECONDS
+
+
+def delete_unreferenced(name, storage=default_storage):
+    """Удаляет файл, если на него больше никто не ссылается.
+
+    Возвращает False, если файл недавно сохраняли и удаление нужно
+    повторить позже. Ссылки проверяются до времени изменения: запись,
+    которая появится после проверки, сначала отметит файл в save().
+    """
+    if not name or is_referenced(name):
+        return True
+    if is_recently_used(name, storage):
+        return False
+    storage.delete(name)
+    return True
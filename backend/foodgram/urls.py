@@ -1,17 +1,13 @@
 from django.contrib import admin
 from django.urls import include, path
 
-from recipes.views import RecipeViewSet
+from recipes.views import recipe_short_link
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     
     path("api/", include("api.urls", namespace="api")),
     
-    path(
-        "s/<int:pk>/",
-        RecipeViewSet.as_view({"get": "retrieve"}),
-        name="recipe-short-link"
-    ),
+    path("s/<str:code>/", recipe_short_link, name="recipe-short-link"),
 
 ]
\ No newline at end of file
@@ -0,0 +1,18 @@
+"""Настройки gunicorn.
+
+Приложение загружается и прогревается в мастер-процессе (preload_app),
+поэтому новый воркер стартует за время fork и сразу готов к запросам.
+"""
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "1"))
+preload_app = True
+
+
+def when_ready(server):
+    # Вызывается в мастере после загрузки приложения и до запуска воркеров
+    from foodgram.startup import warm_up
+
+    server.log.info("Прогрев приложения: %.0f мс", warm_up() * 1000)
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from django.contrib.admin import ModelAdmin, register
+
+from foodgram.admin import LargeTableAdminMixin
+from jobs.models import Job
+
+
+@register(Job)
+class JobAdmin(LargeTableAdminMixin, ModelAdmin):
+    list_display = (
+        "id", "name", "queue", "status", "attempts", "run_at", "finished_at"
+    )
+    list_filter = ("status", ("run_at", admin.DateFieldListFilter))
+    search_fields = ("name", "queue", "idempotency_key")
+    readonly_fields = (
+        "created_at", "finished_at", "locked_by", "locked_until", "progress"
+    )
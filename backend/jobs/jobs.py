@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import job
+
+
+@job("jobs.noop")
+def noop(**payload):
+    """Пустая задача для замеров пропускной способности."""
+
+
+@job("jobs.cleanup")
+def cleanup(days=7):
+    """Удаляет завершённые задачи старше days дней."""
+    Job.objects.filter(
+        status__in=(Job.DONE, Job.FAILED),
+        finished_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()
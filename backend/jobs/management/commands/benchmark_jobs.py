@@ -0,0 +1,87 @@
+import json
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import enqueue
+from jobs.worker import Worker
+
+QUEUE = 'benchmark'
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет пропускную способность очереди задач и проверяет, что '
+        'задачи упавшего воркера подхватываются заново'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument(
+            '--stale',
+            type=int,
+            default=100,
+            help='Сколько задач «упавшего» воркера восстановить'
+        )
+
+    def handle(self, *args, **options):
+        Job.objects.filter(queue=QUEUE).delete()
+        try:
+            report = {
+                'throughput': self._throughput(options),
+                'recovery': self._recovery(options),
+                'idempotency': self._idempotency(),
+            }
+        finally:
+            Job.objects.filter(queue=QUEUE).delete()
+        self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+        if not all(section['ok'] for section in report.values()):
+            raise CommandError('Очередь задач работает некорректно')
+
+    def _drain(self, options):
+        worker = Worker(
+            {QUEUE: options['concurrency']}, poll_interval=0.05, burst=True
+        )
+        started = time.perf_counter()
+        worker.run()
+        return time.perf_counter() - started
+
+    def _result(self, total, elapsed):
+        done = Job.objects.filter(queue=QUEUE, status=Job.DONE).count()
+        Job.objects.filter(queue=QUEUE).delete()
+        return {
+            'jobs': total,
+            'done': done,
+            'seconds': round(elapsed, 3),
+            'jobs_per_second': round(total / elapsed, 1) if elapsed else None,
+            'ok': done == total,
+        }
+
+    def _throughput(self, options):
+        Job.objects.bulk_create(
+            [Job(queue=QUEUE, name='jobs.noop', payload={'index': index})
+             for index in range(options['jobs'])],
+            batch_size=1000,
+        )
+        return self._result(options['jobs'], self._drain(options))
+
+    def _recovery(self, options):
+        # Задачи выглядят так, будто воркер взял их и умер, не продлив
+        # блокировку
+        expired = timezone.now() - timedelta(seconds=1)
+        Job.objects.bulk_create(
+            [Job(queue=QUEUE, name='jobs.noop', status=Job.RUNNING,
+                 attempts=1, locked_by='crashed-worker', locked_until=expired)
+             for _ in range(options['stale'])],
+            batch_size=1000,
+        )
+        return self._result(options['stale'], self._drain(options))
+
+    def _idempotency(self):
+        first = enqueue('jobs.noop', queue=QUEUE, idempotency_key='bench')
+        second = enqueue('jobs.noop', queue=QUEUE, idempotency_key='bench')
+        return {'ok': first.pk == second.pk}
@@ -0,0 +1,61 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркер фоновых задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queue',
+            action='append',
+            dest='queues',
+            help=(
+                'Очередь и число потоков, например files:2; можно указать '
+                'несколько раз (по умолчанию JOBS["QUEUES"])'
+            )
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Завершиться, когда готовых задач не останется'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.JOBS['POLL_INTERVAL']
+        )
+
+    def handle(self, *args, **options):
+        queues = settings.JOBS['QUEUES']
+        if options['queues']:
+            try:
+                queues = {
+                    name: int(limit)
+                    for name, _, limit in (
+                        item.partition(':') for item in options['queues']
+                    )
+                }
+            except ValueError:
+                raise CommandError('Очередь задаётся как имя:потоки')
+        worker = Worker(
+            queues,
+            poll_interval=options['poll_interval'],
+            lock_timeout=settings.JOBS['LOCK_TIMEOUT'],
+            backoff=settings.JOBS['BACKOFF'],
+            backoff_max=settings.JOBS['BACKOFF_MAX'],
+            burst=options['burst'],
+            cleanup_interval=settings.JOBS['CLEANUP_INTERVAL'],
+            cleanup_days=settings.JOBS['CLEANUP_DAYS'],
+        )
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: worker.stop())
+        self.stdout.write(f'Воркер {worker.name}, очереди: {queues}')
+        processed = worker.run()
+        self.stdout.write(self.style.SUCCESS(
+            f'Воркер остановлен, обработано задач: {processed}'
+        ))
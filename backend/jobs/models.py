@@ -0,0 +1,98 @@
+from django.db import models
+from django.utils import timezone
+
+from foodgram.constants import JOB_NAME_MAX_LEN, JOB_QUEUE_MAX_LEN
+
+
+class Job(models.Model):
+    """Задача фоновой очереди; строка таблицы и есть сообщение брокера."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (QUEUED, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Выполнена"),
+        (FAILED, "Ошибка"),
+    )
+
+    queue = models.CharField(
+        max_length=JOB_QUEUE_MAX_LEN,
+        default="default",
+        verbose_name="Очередь"
+    )
+    name = models.CharField(
+        max_length=JOB_NAME_MAX_LEN,
+        verbose_name="Обработчик"
+    )
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Аргументы")
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+        verbose_name="Статус"
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Попыток"
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=5,
+        verbose_name="Максимум попыток"
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Не раньше"
+    )
+    idempotency_key = models.CharField(
+        max_length=JOB_NAME_MAX_LEN,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name="Ключ идемпотентности"
+    )
+    locked_by = models.CharField(
+        max_length=JOB_NAME_MAX_LEN,
+        blank=True,
+        verbose_name="Воркер"
+    )
+    locked_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Блокировка до"
+    )
+    progress = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Прогресс"
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name="Последняя ошибка"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Создана"
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Завершена"
+    )
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        ordering = ("run_at", "id")
+        indexes = [
+            # Выборка готовых к запуску задач очереди
+            models.Index(
+                fields=["queue", "status", "run_at"],
+                name="job_queue_status_run_at_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,69 @@
+"""Регистрация обработчиков и постановка задач в очередь."""
+
+import threading
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from jobs.models import Job
+
+# Имя задачи -> (функция, очередь по умолчанию, максимум попыток)
+registry = {}
+# Задача, которую выполняет текущий поток воркера
+_local = threading.local()
+
+
+def job(name, *, queue="default", max_attempts=5):
+    """Декоратор, регистрирующий функцию как обработчик задачи.
+
+    Обработчик получает аргументы из payload как именованные, поэтому
+    они должны сериализоваться в JSON.
+    """
+    def decorator(func):
+        if name in registry and registry[name][0] is not func:
+            raise ValueError(f"Задача {name} уже зарегистрирована")
+        registry[name] = (func, queue, max_attempts)
+        func.job_name = name
+        return func
+    return decorator
+
+
+def current_job():
+    """Выполняемая в этом потоке задача или None вне воркера."""
+    return getattr(_local, "job", None)
+
+
+def set_progress(**progress):
+    """Сохраняет прогресс выполняемой задачи (например, done и total)."""
+    job = current_job()
+    if job is not None:
+        job.progress = {**job.progress, **progress}
+        Job.objects.filter(pk=job.pk).update(progress=job.progress)
+
+
+def enqueue(name, payload=None, *, queue=None, delay=0,
+            idempotency_key=None, max_attempts=None):
+    """Ставит задачу в очередь и возвращает её.
+
+    Строка пишется в текущей транзакции: если транзакция откатится,
+    задачи тоже не будет. Повторный вызов с тем же idempotency_key
+    возвращает уже существующую задачу.
+    """
+    if name not in registry:
+        raise KeyError(f"Неизвестная задача: {name}")
+    _, default_queue, default_attempts = registry[name]
+    fields = {
+        "name": name,
+        "payload": payload or {},
+        "queue": queue or default_queue,
+        "max_attempts": max_attempts or default_attempts,
+        "run_at": timezone.now() + timedelta(seconds=delay),
+    }
+    if idempotency_key is None:
+        return Job.objects.create(**fields)
+    try:
+        with transaction.atomic():
+            return Job.objects.create(idempotency_key=idempotency_key, **fields)
+    except IntegrityError:
+        return Job.objects.get(idempotency_key=idempotency_key)
@@ -0,0 +1,247 @@
+"""Воркер очереди: забирает задачи из БД и выполняет их в пуле потоков.
+
+Гарантия доставки — «хотя бы один раз»: задача, воркер которой упал,
+снова станет доступна после истечения блокировки, поэтому обработчики
+должны быть идемпотентными.
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.db import (DatabaseError, close_old_connections, connection,
+                       transaction)
+from django.db.models import F, Q
+from django.utils import timezone
+
+from foodgram.constants import (JOB_ERROR_MAX_LEN, JOB_FINISH_ATTEMPTS,
+                                JOB_FINISH_RETRY_DELAY)
+from jobs.models import Job
+from jobs.registry import _local, enqueue, registry
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Обрабатывает очереди с ограничением числа одновременных задач.
+
+    queues — словарь «очередь -> число одновременных задач» в этом
+    процессе. В режиме burst воркер завершается, когда готовых к запуску
+    задач не остаётся. Если задан cleanup_interval, раз в столько секунд
+    воркер ставит в очередь jobs.cleanup для задач старше cleanup_days
+    дней; ключ идемпотентности не даёт нескольким воркерам поставить
+    её дважды за один интервал.
+    """
+
+    def __init__(self, queues, *, poll_interval=1, lock_timeout=300,
+                 backoff=5, backoff_max=3600, burst=False, name=None,
+                 cleanup_interval=None, cleanup_days=7):
+        self.queues = dict(queues)
+        self.poll_interval = poll_interval
+        self.lock_timeout = timedelta(seconds=lock_timeout)
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.burst = burst
+        self.cleanup_interval = cleanup_interval
+        self.cleanup_days = cleanup_days
+        self.name = name or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=sum(self.queues.values()),
+            thread_name_prefix="job",
+        )
+        # Выполняющиеся задачи: future -> (id задачи, очередь)
+        self.running = {}
+        self.processed = 0
+        self._stopping = threading.Event()
+        self._heartbeat_at = 0
+        self._cleanup_at = None
+
+    def stop(self):
+        """Прекращает забирать задачи; текущие будут доведены до конца."""
+        self._stopping.set()
+
+    def run(self):
+        try:
+            while not self._stopping.is_set():
+                self._reap()
+                self._schedule_cleanup()
+                claimed = sum(
+                    self._claim(queue, limit - self._busy(queue))
+                    for queue, limit in self.queues.items()
+                    if limit > self._busy(queue)
+                )
+                self._heartbeat()
+                if claimed:
+                    continue
+                if self.running:
+                    wait(
+                        list(self.running),
+                        timeout=self.poll_interval,
+                        return_when=FIRST_COMPLETED,
+                    )
+                elif self.burst:
+                    break
+                else:
+                    self._stopping.wait(self.poll_interval)
+        finally:
+            self.executor.shutdown(wait=True)
+            self._reap()
+            close_old_connections()
+        return self.processed
+
+    def _busy(self, queue):
+        return sum(1 for _, job_queue in self.running.values()
+                   if job_queue == queue)
+
+    def _reap(self):
+        for future in [future for future in self.running if future.done()]:
+            job_id, _ = self.running.pop(future)
+            self.processed += 1
+            error = future.exception()
+            if error is not None:
+                # Задача осталась в статусе RUNNING и после истечения
+                # блокировки будет выполнена заново
+                logger.error("Не удалось сохранить результат задачи #%s",
+                             job_id, exc_info=error)
+
+    def _schedule_cleanup(self):
+        if self.cleanup_interval is None:
+            return
+        now = time.monotonic()
+        if self._cleanup_at is not None and now < self._cleanup_at:
+            return
+        self._cleanup_at = now + self.cleanup_interval
+        window = int(time.time() // self.cleanup_interval)
+        try:
+            enqueue(
+                "jobs.cleanup",
+                {"days": self.cleanup_days},
+                idempotency_key=f"jobs.cleanup:{window}",
+            )
+        except DatabaseError:
+            logger.exception("Не удалось поставить в очередь jobs.cleanup")
+
+    def _claim(self, queue, limit):
+        """Блокирует до limit готовых задач очереди и отдаёт их в пул.
+
+        Кроме задач в очереди забираются и «зависшие» — те, чей воркер
+        не продлил блокировку (упал или был убит).
+        """
+        now = timezone.now()
+        ready = (
+            Q(status=Job.QUEUED, run_at__lte=now)
+            | Q(status=Job.RUNNING, locked_until__lt=now)
+        )
+        # Без блокировки строк (SQLite) транзакция только мешает: переход
+        # от чтения к записи в ней упирается в записи потоков воркера
+        locking = connection.features.has_select_for_update
+        with transaction.atomic() if locking else nullcontext():
+            ids = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(ready, queue=queue)
+                .order_by("run_at", "id")
+                .values_list("id", flat=True)[:limit]
+            )
+            if not ids:
+                return 0
+            # Условие ready повторяется, чтобы без блокировки строк
+            # задачу не забрали два воркера
+            Job.objects.filter(ready, pk__in=ids).update(
+                status=Job.RUNNING,
+                locked_by=self.name,
+                locked_until=now + self.lock_timeout,
+                attempts=F("attempts") + 1,
+            )
+        jobs = list(Job.objects.filter(
+            pk__in=ids, status=Job.RUNNING, locked_by=self.name
+        ))
+        for job in jobs:
+            future = self.executor.submit(self._execute, job)
+            self.running[future] = (job.pk, queue)
+        return len(jobs)
+
+    def _heartbeat(self):
+        """Продлевает блокировки выполняющихся задач."""
+        interval = self.lock_timeout.total_seconds() / 3
+        if not self.running or time.monotonic() - self._heartbeat_at < interval:
+            return
+        self._heartbeat_at = time.monotonic()
+        Job.objects.filter(
+            pk__in=[job_id for job_id, _ in self.running.values()],
+            status=Job.RUNNING,
+            locked_by=self.name,
+        ).update(locked_until=timezone.now() + self.lock_timeout)
+
+    def _execute(self, job):
+        error = None
+        try:
+            if job.attempts > job.max_attempts:
+                raise RuntimeError("Превышено число попыток")
+            if job.name not in registry:
+                raise KeyError(f"Неизвестная задача: {job.name}")
+            _local.job = job
+            registry[job.name][0](**job.payload)
+        except Exception:
+            error = traceback.format_exc()[-JOB_ERROR_MAX_LEN:]
+            logger.exception("Задача %s #%s завершилась ошибкой",
+                             job.name, job.pk)
+        finally:
+            _local.job = None
+        try:
+            self._finish_with_retry(job, error)
+        finally:
+            close_old_connections()
+
+    def _finish_with_retry(self, job, error):
+        """Сохраняет результат, повторяя запись при ошибках БД.
+
+        Без этого задача, чей результат не удалось записать (например,
+        из-за блокировки таблицы в SQLite), осталась бы в статусе RUNNING
+        и выполнилась бы повторно после истечения блокировки.
+        """
+        for attempt in range(JOB_FINISH_ATTEMPTS):
+            try:
+                self._finish(job, error)
+                return
+            except DatabaseError:
+                if attempt == JOB_FINISH_ATTEMPTS - 1:
+                    raise
+                logger.warning("Повтор записи результата задачи #%s",
+                               job.pk, exc_info=True)
+                close_old_connections()
+                time.sleep(JOB_FINISH_RETRY_DELAY * 2 ** attempt)
+
+    def _finish(self, job, error):
+        now = timezone.now()
+        # Если блокировку перехватил другой воркер, результат не пишем
+        owned = Job.objects.filter(
+            pk=job.pk, status=Job.RUNNING, locked_by=self.name
+        )
+        if error is None:
+            owned.update(status=Job.DONE, finished_at=now,
+                         locked_until=None, last_error="")
+        elif job.attempts >= job.max_attempts:
+            owned.update(status=Job.FAILED, finished_at=now,
+                         locked_until=None, last_error=error)
+        else:
+            delay = min(self.backoff_max,
+                        self.backoff * 2 ** (job.attempts - 1))
+            owned.update(
+                status=Job.QUEUED,
+                run_at=now + timedelta(
+                    seconds=delay * random.uniform(0.5, 1)
+                ),
+                locked_by="",
+                locked_until=None,
+                last_error=error,
+            )
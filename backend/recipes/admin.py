@@ -1,12 +1,34 @@
 from django.contrib import admin
 from django.contrib.admin import ModelAdmin, register, TabularInline
 
+from foodgram.admin import AutocompleteFilter, LargeTableAdminMixin
 from foodgram.constants import INGREDIENT_RECIPE_MIN_AMOUNT
+from foodgram.db.expressions import count_subquery
 from recipes.models import (FavoriteRecipe, Ingredient, RecipeIngredient, Recipe,
                           ShoppingList)
 from users.models import Follow
 
 
+class AuthorFilter(AutocompleteFilter):
+    title = "автору"
+    field_name = "author"
+
+
+class FollowerFilter(AutocompleteFilter):
+    title = "подписчику"
+    field_name = "follower"
+
+
+class RecipeFilter(AutocompleteFilter):
+    title = "рецепту"
+    field_name = "recipe"
+
+
+class IngredientFilter(AutocompleteFilter):
+    title = "ингредиенту"
+    field_name = "ingredient"
+
+
 @register(Ingredient)
 class IngredientAdmin(ModelAdmin):
     list_display = ("id", "name", "measurement_unit")
@@ -24,25 +46,32 @@ class RecipeIngredientInline(TabularInline):
 
 
 @register(Recipe)
-class RecipeAdmin(ModelAdmin):
+class RecipeAdmin(LargeTableAdminMixin, ModelAdmin):
     list_display = ("id", "name", "author", "favorites_count", "publication_date")
-    list_filter = ("author__username",)
+    list_select_related = ("author",)
+    list_filter = (AuthorFilter, ("publication_date", admin.DateFieldListFilter))
     search_fields = ("name__icontains", "author__username")
     inlines = (RecipeIngredientInline,)
     readonly_fields = ("favorites_count",)
-    date_hierarchy = "publication_date"
+    autocomplete_fields = ("author",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            favorites_total=count_subquery(FavoriteRecipe.objects.all(), "recipe")
+        )
 
-    @admin.display(description="В избранном")
+    @admin.display(description="В избранном", ordering="favorites_total")
     def favorites_count(self, obj):
-        return obj.favorites.count()
+        return obj.favorites_total
 
 
 
 @register(RecipeIngredient)
-class RecipeCompositionAdmin(ModelAdmin):
+class RecipeCompositionAdmin(LargeTableAdminMixin, ModelAdmin):
     list_display = ("id", "get_recipe", "get_ingredient", "amount")
     list_select_related = ("recipe", "ingredient")
-    list_filter = ('recipe', 'ingredient')
+    list_filter = (RecipeFilter, IngredientFilter)
+    autocomplete_fields = ("recipe", "ingredient")
     search_fields = ('recipe__name', 'ingredient__name')
 
     @admin.display(description="Рецепт")
@@ -55,7 +84,7 @@ class RecipeCompositionAdmin(ModelAdmin):
 
 
 @register(ShoppingList)
-class UserShoppingCartAdmin(ModelAdmin):
+class UserShoppingCartAdmin(LargeTableAdminMixin, ModelAdmin):
     list_display = ("id", "user", "get_recipe")
     list_select_related = ("user", "recipe")
     search_fields = ("user__username", "recipe__name")
@@ -66,17 +95,19 @@ class UserShoppingCartAdmin(ModelAdmin):
 
 
 @register(Follow)
-class FollowAdmin(ModelAdmin):
+class FollowAdmin(LargeTableAdminMixin, ModelAdmin):
     list_display = ("id", "follower", "author")
+    list_select_related = ("follower", "author")
     search_fields = (
-        "subscriber__username__istartswith",
+        "follower__username__istartswith",
         "author__username__istartswith"
     )
-    list_filter = ("follower", "author")
+    list_filter = (FollowerFilter, AuthorFilter)
+    autocomplete_fields = ("follower", "author")
 
 
 @register(FavoriteRecipe)
-class FavoriteRecipeRecipeAdmin(ModelAdmin):
+class FavoriteRecipeRecipeAdmin(LargeTableAdminMixin, ModelAdmin):
     list_display = ("id", "user", "get_recipe")
     list_select_related = ("user", "recipe")
     search_fields = ("user__username", "recipe__name")
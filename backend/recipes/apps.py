@@ -1,7 +1,47 @@
 from django.apps import AppConfig
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_migrate
+
+
+def create_postgres_indexes(sender, using, **kwargs):
+    """Индексы, которые нельзя описать переносимо через Meta.indexes.
+
+    На PostgreSQL с локалью, отличной от C, обычный индекс по UPPER(name)
+    не применяется к LIKE 'префикс%', нужен класс операторов
+    text_pattern_ops.
+    """
+    from django.db import connections
+
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ingredient_upper_name_like_idx "
+            "ON recipes_ingredient (UPPER(name::text) text_pattern_ops)"
+        )
 
 
 class RecipesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipes'
     verbose_name = "Рецепты"
+
+    def ready(self):
+        from foodgram import events
+        from recipes import search
+        from recipes.archive import restore_on_login
+        from recipes.jobs import delete_recipe_image
+        from recipes.shortlinks import forget_short_links
+
+        post_migrate.connect(create_postgres_indexes, sender=self)
+        post_delete.connect(delete_recipe_image, sender="recipes.Recipe")
+        user_logged_in.connect(restore_on_login)
+        events.track("recipes.Recipe", events.RECIPE)
+        events.track("recipes.RecipeIngredient", events.RECIPE_INGREDIENT,
+                     "recipe_id")
+        events.track("recipes.Ingredient", events.INGREDIENT)
+        events.track("recipes.FavoriteRecipe", events.FAVORITE, "user_id")
+        events.track("recipes.ShoppingList", events.SHOPPING_CART, "user_id")
+        events.subscribe(events.RECIPE, forget_short_links)
+        events.subscribe(events.INGREDIENT, search.ingredients.changed)
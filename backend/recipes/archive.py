@@ -0,0 +1,77 @@
+# recipes/archive.py
+
+"""Перенос списков покупок неактивных пользователей в архив и обратно.
+
+Неактивным считается пользователь без токена (вышедший из аккаунта),
+который не входил дольше заданного срока: пока у пользователя нет токена,
+его список покупок не может быть прочитан, а вход сразу его возвращает.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from foodgram import events
+from recipes.models import ShoppingList, ShoppingListArchive
+from users.models import User
+
+
+def inactive_users(days):
+    cutoff = timezone.now() - timedelta(days=days)
+    return User.objects.filter(
+        Q(last_login__lt=cutoff)
+        | Q(last_login__isnull=True, date_joined__lt=cutoff),
+        auth_token__isnull=True,
+    )
+
+
+def archive_shopping_carts(days, batch_size, progress=None):
+    """Переносит строки порциями, каждую в своей транзакции."""
+    moved = 0
+    users = inactive_users(days)
+    while True:
+        with transaction.atomic():
+            rows = list(
+                ShoppingList.objects.filter(user__in=users)
+                .order_by("pk")
+                .values_list("pk", "user_id", "recipe_id")[:batch_size]
+            )
+            if not rows:
+                return moved
+            ShoppingListArchive.objects.bulk_create([
+                ShoppingListArchive(user_id=user_id, recipe_id=recipe_id)
+                for _, user_id, recipe_id in rows
+            ])
+            ShoppingList.objects.filter(pk__in=[row[0] for row in rows]).delete()
+        moved += len(rows)
+        if progress:
+            progress(moved)
+
+
+def restore_shopping_cart(user):
+    """Возвращает архивный список покупок пользователя в ShoppingList."""
+    archived = list(
+        ShoppingListArchive.objects.filter(user=user).values_list(
+            "pk", "recipe_id"
+        )
+    )
+    if not archived:
+        return 0
+    with transaction.atomic():
+        ShoppingList.objects.bulk_create(
+            [ShoppingList(user=user, recipe_id=recipe_id)
+             for _, recipe_id in archived],
+            ignore_conflicts=True,
+        )
+        ShoppingListArchive.objects.filter(
+            pk__in=[pk for pk, _ in archived]
+        ).delete()
+        # bulk_create не отправляет сигналов
+        events.publish(events.SHOPPING_CART, user.pk)
+    return len(archived)
+
+
+def restore_on_login(sender, user, **kwargs):
+    restore_shopping_cart(user)
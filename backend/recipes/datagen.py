@@ -0,0 +1,279 @@
+# recipes/datagen.py
+
+"""Генератор синтетических данных для нагрузочного тестирования.
+
+Данные строятся детерминированно по зерну: каждая порция (chunk)
+получает собственный генератор случайных чисел, поэтому результат не
+зависит от числа процессов. Популярность авторов, рецептов и
+ингредиентов подчиняется распределению Ципфа.
+"""
+
+import bisect
+import itertools
+import multiprocessing
+import random
+
+from django.core.management.color import no_style
+from django.db import connection, connections
+
+from foodgram import events
+from foodgram.db.bulk import copy_rows
+from recipes.models import (FavoriteRecipe, Ingredient, Recipe,
+                            RecipeIngredient, ShoppingList)
+from users.models import Follow, User
+
+# Состояние генератора, унаследованное рабочими процессами при fork
+_GENERATOR = None
+
+
+class ZipfSampler:
+    """Выборка элементов с вероятностью, обратной рангу в степени skew."""
+
+    def __init__(self, items, skew, rnd):
+        self.items = list(items)
+        # Ранги раздаются в случайном порядке, чтобы популярными были
+        # не только элементы с наименьшими id
+        rnd.shuffle(self.items)
+        self.cum_weights = list(itertools.accumulate(
+            1 / rank ** skew for rank in range(1, len(self.items) + 1)
+        ))
+        self.total = self.cum_weights[-1] if self.cum_weights else 0
+
+    def sample(self, rnd):
+        index = bisect.bisect_left(self.cum_weights, rnd.random() * self.total)
+        return self.items[min(index, len(self.items) - 1)]
+
+    def sample_unique(self, rnd, count, exclude=None):
+        """До count различных элементов; популярные выпадают чаще."""
+        count = min(count, len(self.items) - (1 if exclude else 0))
+        result = set()
+        # Ограничиваем число попыток: при сильном перекосе хвост
+        # распределения почти не выпадает
+        for _ in range(count * 4):
+            if len(result) >= count:
+                break
+            item = self.sample(rnd)
+            if item != exclude:
+                result.add(item)
+        return result
+
+
+def _run_task(task):
+    phase, chunk, start, stop = task
+    connections.close_all()
+    return _GENERATOR.run_chunk(phase, chunk, start, stop)
+
+
+class SyntheticDataGenerator:
+    """Порционная генерация пользователей, рецептов и связей между ними."""
+
+    def __init__(self, *, users, recipes, ingredients=0,
+                 ingredients_per_recipe=8, follows_per_user=10,
+                 favorites_per_user=20, cart_per_user=5, skew=1.1, seed=0,
+                 chunk_size=5000, workers=1, use_copy=True, prefix='gen'):
+        self.users = users
+        self.recipes = recipes
+        self.ingredients = ingredients
+        self.ingredients_per_recipe = ingredients_per_recipe
+        self.follows_per_user = follows_per_user
+        self.favorites_per_user = favorites_per_user
+        self.cart_per_user = cart_per_user
+        self.skew = skew
+        self.seed = seed
+        self.chunk_size = chunk_size
+        # SQLite не допускает параллельной записи
+        self.workers = workers if connection.vendor != 'sqlite' else 1
+        self.use_copy = use_copy and connection.vendor == 'postgresql'
+        self.prefix = prefix
+
+    def rng(self, *parts):
+        return random.Random(':'.join(map(str, (self.seed, *parts))))
+
+    def run(self, progress=None):
+        """Заполняет базу и возвращает число созданных строк по фазам."""
+        self._create_ingredients()
+        self.user_base = self._next_id(User)
+        self.recipe_base = self._next_id(Recipe)
+        self.user_ids = range(self.user_base, self.user_base + self.users)
+        self.recipe_ids = range(
+            self.recipe_base, self.recipe_base + self.recipes
+        )
+        self.ingredient_ids = list(
+            Ingredient.objects.order_by('id').values_list('id', flat=True)
+        )
+        self.authors = ZipfSampler(
+            self.user_ids, self.skew, self.rng('authors')
+        )
+        self.popular_recipes = ZipfSampler(
+            self.recipe_ids, self.skew, self.rng('recipes')
+        )
+        self.popular_ingredients = ZipfSampler(
+            self.ingredient_ids, self.skew, self.rng('ingredients')
+        )
+
+        phases = (
+            ('users', self.users),
+            ('recipes', self.recipes),
+            ('ingredients', self.recipes),
+            ('follows', self.users),
+            ('favorites', self.users),
+            ('carts', self.users),
+        )
+        totals = {}
+        for phase, size in phases:
+            tasks = [
+                (phase, chunk, start, min(start + self.chunk_size, size))
+                for chunk, start in enumerate(range(0, size, self.chunk_size))
+            ]
+            totals[phase] = 0
+            for rows in self._map(tasks):
+                totals[phase] += rows
+                if progress:
+                    progress(phase, totals[phase])
+            if phase in ('users', 'recipes'):
+                self._reset_sequences()
+        # Данные записаны в обход сигналов: кэши сбрасываются целиком
+        for entity in (events.USER, events.INGREDIENT, events.RECIPE,
+                       events.RECIPE_INGREDIENT, events.FOLLOW,
+                       events.FAVORITE, events.SHOPPING_CART):
+            events.publish(entity)
+        return totals
+
+    def _map(self, tasks):
+        global _GENERATOR
+        if self.workers <= 1 or len(tasks) <= 1:
+            for phase, chunk, start, stop in tasks:
+                yield self.run_chunk(phase, chunk, start, stop)
+            return
+        _GENERATOR = self
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with context.Pool(self.workers) as pool:
+            yield from pool.imap_unordered(_run_task, tasks)
+
+    def _next_id(self, model):
+        last = model.objects.order_by('-id').values_list('id', flat=True)
+        return (last.first() or 0) + 1
+
+    def _reset_sequences(self):
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [User, Recipe]
+        )
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def _create_ingredients(self):
+        if not self.ingredients:
+            return
+        Ingredient.objects.bulk_create(
+            [
+                Ingredient(
+                    name=f'{self.prefix} ингредиент {index}',
+                    measurement_unit=self.rng('unit', index).choice(
+                        ('г', 'мл', 'шт.', 'ст. л.', 'ч. л.')
+                    ),
+                )
+                for index in range(self.ingredients)
+            ],
+            batch_size=self.chunk_size,
+            ignore_conflicts=True,
+        )
+
+    def run_chunk(self, phase, chunk, start, stop):
+        rnd = self.rng(phase, chunk)
+        return getattr(self, f'_generate_{phase}')(rnd, start, stop)
+
+    def _generate_users(self, rnd, start, stop):
+        User.objects.bulk_create(
+            [
+                User(
+                    id=user_id,
+                    username=f'{self.prefix}_user_{user_id}',
+                    email=f'{self.prefix}_user_{user_id}@example.com',
+                    first_name=rnd.choice(('Анна', 'Иван', 'Мария', 'Пётр')),
+                    last_name=f'Тестов {user_id}',
+                    password='!',
+                )
+                for user_id in self.user_ids[start:stop]
+            ],
+            batch_size=self.chunk_size,
+        )
+        return stop - start
+
+    def _generate_recipes(self, rnd, start, stop):
+        Recipe.objects.bulk_create(
+            [
+                Recipe(
+                    id=self.recipe_base + index,
+                    author_id=self.authors.sample(rnd),
+                    name=f'Рецепт {index}',
+                    text='Инструкция приготовления. ' * rnd.randint(1, 40),
+                    cooking_time=rnd.randint(1, 180),
+                )
+                for index in range(start, stop)
+            ],
+            batch_size=self.chunk_size,
+        )
+        return stop - start
+
+    def _per_user_count(self, rnd, mean):
+        # Большинство пользователей активны мало, единицы — очень много
+        return int(rnd.expovariate(1 / mean)) if mean > 0 else 0
+
+    def _generate_ingredients(self, rnd, start, stop):
+        rows = [
+            (self.recipe_base + index, ingredient_id, rnd.randint(1, 500))
+            for index in range(start, stop)
+            for ingredient_id in self.popular_ingredients.sample_unique(
+                rnd, rnd.randint(1, 2 * self.ingredients_per_recipe - 1)
+            )
+        ]
+        return self._write(
+            RecipeIngredient, ('recipe', 'ingredient', 'amount'), rows
+        )
+
+    def _generate_follows(self, rnd, start, stop):
+        rows = []
+        for index in range(start, stop):
+            follower_id = self.user_base + index
+            authors = self.authors.sample_unique(
+                rnd,
+                self._per_user_count(rnd, self.follows_per_user),
+                exclude=follower_id,
+            )
+            rows.extend((follower_id, author_id) for author_id in authors)
+        return self._write(Follow, ('follower', 'author'), rows)
+
+    def _generate_relations(self, model, mean, rnd, start, stop):
+        rows = [
+            (self.user_base + index, recipe_id)
+            for index in range(start, stop)
+            for recipe_id in self.popular_recipes.sample_unique(
+                rnd, self._per_user_count(rnd, mean)
+            )
+        ]
+        return self._write(model, ('user', 'recipe'), rows)
+
+    def _generate_favorites(self, rnd, start, stop):
+        return self._generate_relations(
+            FavoriteRecipe, self.favorites_per_user, rnd, start, stop
+        )
+
+    def _generate_carts(self, rnd, start, stop):
+        return self._generate_relations(
+            ShoppingList, self.cart_per_user, rnd, start, stop
+        )
+
+    def _write(self, model, field_names, rows):
+        if self.use_copy:
+            return copy_rows(model, field_names, rows)
+        attnames = [
+            model._meta.get_field(name).attname for name in field_names
+        ]
+        model.objects.bulk_create(
+            [model(**dict(zip(attnames, row))) for row in rows],
+            batch_size=self.chunk_size,
+            ignore_conflicts=True,
+        )
+        return len(rows)
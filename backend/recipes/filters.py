@@ -1,19 +1,41 @@
 import django_filters
+from django.db.models import Case, When
 from django_filters.rest_framework import FilterSet, filters
 
+from foodgram.constants import INGREDIENT_FUZZY_LIMIT
+from recipes import search
 from recipes.models import Ingredient, Recipe
 
 
 class IngredientFilter(FilterSet):
     name = filters.CharFilter(
-        field_name="name",
-        lookup_expr="istartswith",
+        method="filter_name",
         help_text="Поиск ингредиентов по началу названия"
     )
+    fuzzy = filters.BooleanFilter(
+        method="filter_fuzzy",
+        help_text="Искать название с опечатками"
+    )
+
+    def filter_name(self, queryset, name, value):
+        if not (self.form.cleaned_data.get("fuzzy")
+                and search.max_distance(search.normalize(value))):
+            return queryset.filter(name__istartswith=value)
+        pks = search.ingredients.search(value, INGREDIENT_FUZZY_LIMIT)
+        if not pks:
+            return queryset.none()
+        # Порядок выдачи — ранжирование индекса
+        return queryset.filter(pk__in=pks).order_by(Case(
+            *(When(pk=pk, then=position) for position, pk in enumerate(pks))
+        ))
+
+    def filter_fuzzy(self, queryset, name, value):
+        # Флаг только меняет режим фильтра name
+        return queryset
 
     class Meta:
         model = Ingredient
-        fields = ("name",)
+        fields = ("name", "fuzzy")
 
 
 class RecipeFilter(FilterSet):
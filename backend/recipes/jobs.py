@@ -0,0 +1,56 @@
+from django.db import transaction
+
+from foodgram.constants import MEDIA_DELETE_GRACE_SECONDS
+from foodgram.storage import delete_unreferenced
+from jobs.registry import enqueue, job
+
+
+@job("recipes.delete_files", queue="files")
+def delete_files(names):
+    """Удаляет файлы, на которые больше не ссылаются записи в БД.
+
+    Файлы хранятся по хешу содержимого и бывают общими для нескольких
+    рецептов и аватаров; отсутствующие файлы пропускаются, а недавно
+    сохранённые откладываются новой задачей.
+    """
+    postponed = [name for name in names if not delete_unreferenced(name)]
+    if postponed:
+        enqueue("recipes.delete_files", {"names": postponed},
+                delay=MEDIA_DELETE_GRACE_SECONDS)
+
+
+class PendingDeletes:
+    """Файлы, удаление которых ждёт фиксации текущей транзакции."""
+
+    def __init__(self):
+        self.names = []
+
+    def __call__(self):
+        enqueue("recipes.delete_files", {"names": self.names})
+
+
+def delete_files_later(*names):
+    """Удаляет файлы фоновой задачей после фиксации транзакции.
+
+    Все файлы одной транзакции уходят одной задачей; при откате
+    транзакции файлы остаются на месте.
+    """
+    names = [name for name in names if name]
+    if not names:
+        return
+    connection = transaction.get_connection()
+    pending = getattr(connection, "pending_file_deletes", None)
+    # Колбэк из откаченной транзакции Django уже выбросил
+    if pending is not None and any(
+        callback is pending for _, callback, _ in connection.run_on_commit
+    ):
+        pending.names.extend(names)
+        return
+    pending = connection.pending_file_deletes = PendingDeletes()
+    pending.names.extend(names)
+    # Вне транзакции колбэк выполняется сразу
+    transaction.on_commit(pending)
+
+
+def delete_recipe_image(sender, instance, **kwargs):
+    delete_files_later(instance.image.name)
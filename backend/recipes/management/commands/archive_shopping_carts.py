@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from foodgram.constants import (SHOPPING_CART_ARCHIVE_AFTER_DAYS,
+                                SHOPPING_CART_ARCHIVE_BATCH_SIZE)
+from recipes.archive import archive_shopping_carts
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит списки покупок вышедших из аккаунта и давно не входивших '
+        'пользователей в архивную таблицу'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--inactive-days',
+            type=int,
+            default=SHOPPING_CART_ARCHIVE_AFTER_DAYS,
+            help='Сколько дней пользователь не входил'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SHOPPING_CART_ARCHIVE_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        def progress(moved):
+            self.stdout.write(f'Перенесено строк: {moved}')
+
+        moved = archive_shopping_carts(
+            options['inactive_days'],
+            options['batch_size'],
+            progress=progress if options['verbosity'] >= 2 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено в архив строк: {moved}'
+        ))
@@ -0,0 +1,441 @@
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.renderers import FastJSONRenderer
+from api.throttling import UserTokenBucketThrottle, local_buckets
+from foodgram import events
+from foodgram.constants import INGREDIENT_FUZZY_LIMIT
+from foodgram.startup import measure_boot
+from recipes import search, shortlinks
+from recipes.datagen import SyntheticDataGenerator
+from recipes.models import FavoriteRecipe, Ingredient
+from users.models import User
+
+# Прозрачный PNG 1x1 для создания рецептов
+TINY_PNG = (
+    "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJ"
+    "AAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+PERCENTILES = (50, 95, 99)
+# Списки админки, число запросов которых не должно зависеть от объёма
+# данных; команда завершается ошибкой, если оно превышает ADMIN_QUERY_BUDGET
+ADMIN_QUERY_BUDGET = 6
+ADMIN_PAGES = (
+    'recipes/recipe',
+    'recipes/recipeingredient',
+    'recipes/favoriterecipe',
+    'recipes/shoppinglist',
+    'users/follow',
+    'users/user',
+    'jobs/job',
+)
+# Ответы, на которых сравнивается скорость сериализации в JSON
+RENDER_SCENARIOS = (
+    ('recipe_list', '/api/recipes/', {'limit': 6}),
+    ('subscriptions', '/api/users/subscriptions/', {'recipes_limit': 3}),
+    ('ingredient_search', '/api/ingredients/', {'name': 'bench'}),
+)
+
+
+def percentile(values, rank):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, int(round(rank / 100 * len(ordered))) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу синтетическими данными и замеряет задержки '
+        'и количество запросов к БД на основных эндпоинтах API'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--ingredients', type=int, default=500)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--follows-per-user', type=int, default=10)
+        parser.add_argument('--favorites-per-user', type=int, default=20)
+        parser.add_argument('--cart-per-user', type=int, default=5)
+        parser.add_argument('--skew', type=float, default=1.1)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            help='Файл для JSON-отчёта (по умолчанию stdout)'
+        )
+        parser.add_argument(
+            '--boot-runs',
+            type=int,
+            default=3,
+            help='Сколько раз замерить запуск приложения (0 — не замерять)'
+        )
+        parser.add_argument(
+            '--fuzzy-names',
+            type=int,
+            default=100000,
+            help='Размер каталога для замера нечёткого поиска (0 — не замерять)'
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Не откатывать сгенерированные данные после замеров'
+        )
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options['seed'])
+        # Лимиты частоты запросов исказили бы замеры эндпоинтов
+        throttle_off = {**settings.THROTTLE, 'ENABLED': False}
+        with tempfile.TemporaryDirectory() as media_root, \
+                override_settings(MEDIA_ROOT=media_root), \
+                transaction.atomic():
+            viewer, recipe_ids, author_id = self._seed(rnd, options)
+            with override_settings(THROTTLE=throttle_off):
+                results = self._run(
+                    rnd, viewer, recipe_ids, author_id, options
+                )
+                render = self._run_render(viewer, options)
+                results.update(self._run_admin(options))
+            throttle = self._run_throttle(viewer, options)
+            if not options['keep']:
+                transaction.set_rollback(True)
+        boot = self._run_boot(options)
+        fuzzy = self._run_fuzzy(rnd, options)
+
+        report = json.dumps(
+            {
+                'meta': {
+                    'vendor': connection.vendor,
+                    **{
+                        key: options[key] for key in (
+                            'users', 'recipes', 'ingredients',
+                            'ingredients_per_recipe', 'follows_per_user',
+                            'favorites_per_user', 'cart_per_user',
+                            'skew', 'iterations', 'seed',
+                        )
+                    },
+                },
+                'results': results,
+                'render': render,
+                'throttle': throttle,
+                'boot': boot,
+                'fuzzy_search': fuzzy,
+            },
+            indent=2,
+            sort_keys=True,
+        )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+            self.stdout.write(self.style.SUCCESS(
+                f'Отчёт сохранён в {options["output"]}'
+            ))
+        else:
+            self.stdout.write(report)
+
+        over_budget = sorted(
+            name for name, result in results.items()
+            if name.startswith('admin_')
+            and result['queries_max'] > ADMIN_QUERY_BUDGET
+        )
+        if over_budget:
+            raise CommandError(
+                f'Больше {ADMIN_QUERY_BUDGET} запросов к БД: '
+                f'{", ".join(over_budget)}'
+            )
+
+    def _seed(self, rnd, options):
+        generator = SyntheticDataGenerator(
+            users=options['users'],
+            recipes=options['recipes'],
+            ingredients=options['ingredients'],
+            ingredients_per_recipe=options['ingredients_per_recipe'],
+            follows_per_user=options['follows_per_user'],
+            favorites_per_user=options['favorites_per_user'],
+            cart_per_user=options['cart_per_user'],
+            skew=options['skew'],
+            seed=options['seed'],
+            prefix='bench',
+        )
+        generator.run()
+        viewer = User.objects.get(id=generator.user_ids[0])
+        Token.objects.get_or_create(user=viewer)
+        # Самый плодовитый автор — худший случай для фильтра по автору
+        return viewer, generator.recipe_ids, generator.authors.items[0]
+
+    def _scenarios(self, rnd, viewer, recipe_ids, author_id):
+        """Тройки (имя, запрос, подготовка) для горячих эндпоинтов.
+
+        Подготовка выполняется вне замера и приводит базу в состояние,
+        в котором запрос завершается успешно на каждой итерации.
+        """
+        toggle_recipe = rnd.choice(recipe_ids)
+        ingredient_ids = list(
+            Ingredient.objects.filter(
+                name__startswith='bench'
+            ).values_list('id', flat=True)[:3]
+        )
+        new_recipe = {
+            'ingredients': [
+                {'id': ingredient_id, 'amount': 10}
+                for ingredient_id in ingredient_ids
+            ],
+            'image': TINY_PNG,
+            'name': 'Новый рецепт',
+            'text': 'Описание',
+            'cooking_time': 10,
+        }
+
+        # Неделя питания крупной семьи: 200 рецептов с разными порциями
+        meal_plan = {'recipes': [
+            {'id': recipe_id, 'servings': rnd.choice((0.5, 1, 2, 4))}
+            for recipe_id in rnd.sample(
+                list(recipe_ids), min(200, len(recipe_ids))
+            )
+        ]}
+
+        def unfavorite():
+            FavoriteRecipe.objects.filter(
+                user=viewer, recipe_id=toggle_recipe
+            ).delete()
+
+        def favorite():
+            FavoriteRecipe.objects.get_or_create(
+                user=viewer, recipe_id=toggle_recipe
+            )
+
+        return (
+            ('recipe_list', lambda client: client.get(
+                '/api/recipes/', {'limit': 6}
+            ), None),
+            ('recipe_list_by_author', lambda client: client.get(
+                '/api/recipes/', {'author': author_id}
+            ), None),
+            # Выборки по избранному и списку покупок зрителя: их время не
+            # должно расти вместе с таблицами связей
+            ('favorites_filter', lambda client: client.get(
+                '/api/recipes/', {'is_favorited': 1, 'limit': 6}
+            ), None),
+            ('shopping_cart_filter', lambda client: client.get(
+                '/api/recipes/', {'is_in_shopping_cart': 1, 'limit': 6}
+            ), None),
+            ('recipe_detail', lambda client: client.get(
+                f'/api/recipes/{rnd.choice(recipe_ids)}/'
+            ), None),
+            ('short_link', lambda client: client.get(
+                f'/s/{shortlinks.encode(rnd.choice(recipe_ids))}/'
+            ), None),
+            ('ingredient_search', lambda client: client.get(
+                '/api/ingredients/', {'name': 'bench'}
+            ), None),
+            ('ingredient_fuzzy', lambda client: client.get(
+                '/api/ingredients/',
+                {'name': 'bench ингридиент 1', 'fuzzy': 'true'}
+            ), None),
+            ('subscriptions', lambda client: client.get(
+                '/api/users/subscriptions/', {'recipes_limit': 3}
+            ), None),
+            ('download_shopping_cart', lambda client: client.get(
+                '/api/recipes/download_shopping_cart/'
+            ), None),
+            ('favorite_add', lambda client: client.post(
+                f'/api/recipes/{toggle_recipe}/favorite/'
+            ), unfavorite),
+            ('favorite_remove', lambda client: client.delete(
+                f'/api/recipes/{toggle_recipe}/favorite/'
+            ), favorite),
+            ('meal_plan', lambda client: client.post(
+                '/api/recipes/meal_plan/', meal_plan,
+                content_type='application/json'
+            ), None),
+            ('meal_plan_uncached', lambda client: client.post(
+                '/api/recipes/meal_plan/', meal_plan,
+                content_type='application/json'
+            ), self._reset_meal_plans),
+            ('recipe_create', lambda client: client.post(
+                '/api/recipes/', new_recipe, content_type='application/json'
+            ), None),
+        )
+
+    @staticmethod
+    def _reset_meal_plans():
+        # Замер идёт внутри откатываемой транзакции, где publish() ждал бы
+        # фиксации, поэтому событие обрабатывается сразу
+        events.dispatch({events.RECIPE_INGREDIENT: None})
+
+    def _client(self, viewer):
+        token = Token.objects.get(user=viewer)
+        return Client(
+            raise_request_exception=False,
+            SERVER_NAME='localhost',
+            HTTP_AUTHORIZATION=f'Token {token.key}',
+        )
+
+    def _run(self, rnd, viewer, recipe_ids, author_id, options):
+        return self._measure(
+            self._client(viewer),
+            self._scenarios(rnd, viewer, recipe_ids, author_id),
+            options,
+        )
+
+    def _measure(self, client, scenarios, options):
+        results = {}
+        for name, request, prepare in scenarios:
+            timings = []
+            queries = []
+            statuses = set()
+            for _ in range(options['iterations']):
+                if prepare:
+                    prepare()
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    response = request(client)
+                    timings.append((time.perf_counter() - started) * 1000)
+                queries.append(len(context.captured_queries))
+                statuses.add(response.status_code)
+            results[name] = {
+                **{
+                    f'p{rank}_ms': round(percentile(timings, rank), 3)
+                    for rank in PERCENTILES
+                },
+                'mean_ms': round(sum(timings) / len(timings), 3),
+                'queries_min': min(queries),
+                'queries_max': max(queries),
+                'statuses': sorted(statuses),
+            }
+        return results
+
+    def _run_admin(self, options):
+        """Замеры списков админки под суперпользователем."""
+        admin_user = User.objects.create_superuser(
+            username='bench_admin', email='bench_admin@example.com'
+        )
+        client = Client(raise_request_exception=False, SERVER_NAME='localhost')
+        client.force_login(admin_user)
+        scenarios = [
+            (f'admin_{page.replace("/", "_")}', lambda client, page=page:
+                client.get(f'/admin/{page}/'), None)
+            for page in ADMIN_PAGES
+        ]
+        return self._measure(client, scenarios, options)
+
+    def _run_boot(self, options):
+        """Медианное время запуска приложения в новом процессе, мс."""
+        runs = [measure_boot() for _ in range(options['boot_runs'])]
+        if not runs:
+            return {}
+        return {
+            key: round(statistics.median(run[key] for run in runs), 1)
+            for key in ('load_ms', 'warm_up_ms', 'process_ms')
+        }
+
+    def _run_throttle(self, viewer, options):
+        """Стоимость проверки лимита частоты запросов для одного запроса."""
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = viewer
+        throttle = UserTokenBucketThrottle()
+        iterations = options['iterations'] * 100
+        allowed = 0
+        local_buckets.clear()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                allowed += throttle.allow_request(request, None)
+            elapsed = time.perf_counter() - started
+        local_buckets.clear()
+        return {
+            'checks': iterations,
+            'allowed': allowed,
+            'mean_us': round(elapsed / iterations * 1_000_000, 3),
+            'queries': len(context.captured_queries),
+        }
+
+    def _run_fuzzy(self, rnd, options):
+        """Нечёткий поиск по каталогу из --fuzzy-names названий.
+
+        Каталог — настоящие названия из data/ingredients.json и их
+        сочетания; в каждом запросе одна опечатка после первой буквы.
+        """
+        if not options['fuzzy_names']:
+            return {}
+        path = Path(search.__file__).resolve().parent / 'data' / (
+            'ingredients.json'
+        )
+        with open(path, encoding='utf-8') as file:
+            base = [item['name'] for item in json.load(file)]
+        names = base[:options['fuzzy_names']]
+        while len(names) < options['fuzzy_names']:
+            names.append(
+                f'{rnd.choice(base)} {rnd.choice(base).split()[0]} '
+                f'{len(names)}'
+            )
+        index = search.IngredientIndex()
+        started = time.perf_counter()
+        index.build(enumerate(names, 1))
+        build_ms = (time.perf_counter() - started) * 1000
+
+        letters = 'абвгдеиклмнопрстуя'
+        timings = []
+        found = 0
+        for _ in range(options['iterations'] * 20):
+            query = search.normalize(rnd.choice(names))[:rnd.randint(4, 14)]
+            position = rnd.randrange(1, len(query))
+            query = (query[:position] + rnd.choice(letters)
+                     + query[position + 1:])
+            started = time.perf_counter()
+            found += bool(index.search(query, INGREDIENT_FUZZY_LIMIT))
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        return {
+            'names': len(names),
+            'build_ms': round(build_ms, 1),
+            'queries': len(timings),
+            'found': found,
+            **{
+                f'p{rank}_us': round(percentile(timings, rank), 1)
+                for rank in PERCENTILES
+            },
+        }
+
+    def _run_render(self, viewer, options):
+        """Время сериализации готовых ответов стандартным и быстрым рендерером.
+
+        Заодно проверяется, что оба рендерера выдают одинаковые байты.
+        """
+        client = self._client(viewer)
+        renderers = {
+            'drf': JSONRenderer(),
+            'fast': FastJSONRenderer(),
+        }
+        results = {}
+        for name, path, params in RENDER_SCENARIOS:
+            data = client.get(path, params).data
+            output = {}
+            result = {}
+            for label, renderer in renderers.items():
+                timings = []
+                for _ in range(options['iterations']):
+                    started = time.perf_counter()
+                    output[label] = renderer.render(data)
+                    timings.append((time.perf_counter() - started) * 1000)
+                result[f'{label}_mean_ms'] = round(
+                    sum(timings) / len(timings), 4
+                )
+            result['bytes'] = len(output['drf'])
+            result['identical'] = output['drf'] == output['fast']
+            results[name] = result
+        return results
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+from recipes.management.commands.benchmark_api import PERCENTILES, percentile
+
+
+async def fetch(host, port, target, timeout):
+    """Один GET-запрос по HTTP/1.1; возвращает статус ответа."""
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port), timeout
+    )
+    try:
+        writer.write(
+            f'GET {target} HTTP/1.1\r\nHost: {host}\r\n'
+            'Connection: close\r\n\r\n'.encode()
+        )
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        # Дочитываем тело, как это делает реальный клиент
+        await asyncio.wait_for(reader.read(), timeout)
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет пропускную способность запущенного сервера при большом '
+        'числе одновременных клиентов; позволяет сравнить WSGI и ASGI'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'url',
+            help='Например, http://localhost:8000/api/ingredients/?name=мол'
+        )
+        parser.add_argument('--concurrency', type=int, default=500)
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        target = url.path + (f'?{url.query}' if url.query else '')
+        results = asyncio.run(self._run(
+            url.hostname, url.port or 80, target, options
+        ))
+        self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+
+    async def _run(self, host, port, target, options):
+        queue = asyncio.Queue()
+        for _ in range(options['requests']):
+            queue.put_nowait(None)
+        timings = []
+        statuses = {}
+        errors = 0
+
+        async def client():
+            nonlocal errors
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    status = await fetch(host, port, target, options['timeout'])
+                except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                    errors += 1
+                    continue
+                timings.append((time.perf_counter() - started) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(client() for _ in range(options['concurrency']))
+        )
+        elapsed = time.perf_counter() - started
+        return {
+            'concurrency': options['concurrency'],
+            'requests': options['requests'],
+            'errors': errors,
+            'statuses': statuses,
+            'elapsed_s': round(elapsed, 3),
+            'rps': round(len(timings) / elapsed, 1),
+            **{
+                f'p{rank}_ms': round(percentile(timings, rank), 3)
+                for rank in PERCENTILES
+                if timings
+            },
+        }
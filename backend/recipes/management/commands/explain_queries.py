@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from recipes.models import FavoriteRecipe, Ingredient, Recipe, ShoppingList
+from users.models import Follow
+
+# Признаки использования индекса в планах SQLite и PostgreSQL
+INDEX_MARKERS = ("USING INDEX", "USING COVERING INDEX", "Index Scan",
+                 "Index Only Scan", "Bitmap Index Scan")
+SUPPORTED_VENDORS = ("sqlite", "postgresql")
+
+
+class Command(BaseCommand):
+    help = 'Выводит планы выполнения основных запросов и проверяет индексы'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Завершиться ошибкой, если запрос не использует индекс'
+        )
+
+    def queries(self):
+        queries = [
+            (
+                'Рецепты автора по дате',
+                Recipe.objects.filter(author_id=1).order_by(
+                    '-publication_date'
+                )[:6],
+            ),
+            (
+                'Избранное пользователя',
+                FavoriteRecipe.objects.filter(user_id=1),
+            ),
+            (
+                'Список покупок пользователя',
+                ShoppingList.objects.filter(user_id=1),
+            ),
+            ('Подписки пользователя', Follow.objects.filter(follower_id=1)),
+        ]
+        # В SQLite istartswith транслируется в LIKE без UPPER, и индекс
+        # по выражению к нему неприменим
+        if connection.vendor == 'postgresql':
+            queries.append((
+                'Поиск ингредиента по началу названия',
+                Ingredient.objects.filter(name__istartswith='мол'),
+            ))
+        return queries
+
+    def handle(self, *args, **options):
+        # Формат EXPLAIN у остальных СУБД другой, и без признаков индекса
+        # каждый запрос выглядел бы как полный просмотр таблицы
+        if connection.vendor not in SUPPORTED_VENDORS:
+            raise CommandError(
+                f'Планы запросов проверяются только для '
+                f'{", ".join(SUPPORTED_VENDORS)}, а база использует '
+                f'{connection.vendor}'
+            )
+        failed = []
+        for title, queryset in self.queries():
+            plan = queryset.explain()
+            uses_index = any(marker in plan for marker in INDEX_MARKERS)
+            style = self.style.SUCCESS if uses_index else self.style.WARNING
+            self.stdout.write(style(f'{title}:'))
+            self.stdout.write(plan)
+            if not uses_index:
+                failed.append(title)
+        if failed and options['strict']:
+            raise CommandError(
+                'Без индекса выполняются: ' + ', '.join(failed)
+            )
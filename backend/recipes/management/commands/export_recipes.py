@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from foodgram.constants import RECIPE_NDJSON_CHUNK_SIZE
+from recipes.ndjson import export_recipes
+
+
+class Command(BaseCommand):
+    help = 'Выгружает рецепты в NDJSON: одна строка — один рецепт'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Файл для выгрузки (по умолчанию stdout)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=RECIPE_NDJSON_CHUNK_SIZE
+        )
+        parser.add_argument(
+            '--after-id',
+            type=int,
+            default=0,
+            help='Выгрузить только рецепты с id больше заданного'
+        )
+
+    def handle(self, *args, **options):
+        if not options['output']:
+            export_recipes(
+                self.stdout, options['chunk_size'], options['after_id']
+            )
+            return
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            exported = export_recipes(
+                output, options['chunk_size'], options['after_id']
+            )
+        self.stderr.write(self.style.SUCCESS(
+            f'Выгружено рецептов: {exported}'
+        ))
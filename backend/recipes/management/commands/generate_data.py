@@ -0,0 +1,77 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipes.datagen import SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует пользователей, рецепты, избранное, списки покупок '
+        'и подписки с перекосом популярности по закону Ципфа'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--recipes', type=int, default=1_000_000)
+        parser.add_argument(
+            '--ingredients',
+            type=int,
+            default=0,
+            help='Сколько синтетических ингредиентов добавить к каталогу'
+        )
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--follows-per-user', type=int, default=10)
+        parser.add_argument('--favorites-per-user', type=int, default=20)
+        parser.add_argument('--cart-per-user', type=int, default=5)
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Показатель распределения Ципфа'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Число процессов (для SQLite всегда 1)'
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Использовать bulk_create вместо COPY на PostgreSQL'
+        )
+
+    def handle(self, *args, **options):
+        generator = SyntheticDataGenerator(
+            users=options['users'],
+            recipes=options['recipes'],
+            ingredients=options['ingredients'],
+            ingredients_per_recipe=options['ingredients_per_recipe'],
+            follows_per_user=options['follows_per_user'],
+            favorites_per_user=options['favorites_per_user'],
+            cart_per_user=options['cart_per_user'],
+            skew=options['skew'],
+            seed=options['seed'],
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            use_copy=not options['no_copy'],
+        )
+        started = time.monotonic()
+
+        def progress(phase, rows):
+            self.stdout.write(
+                f'{phase}: {rows} строк, '
+                f'{time.monotonic() - started:.1f} с'
+            )
+
+        if options['verbosity'] < 2:
+            progress = None
+        totals = generator.run(progress=progress)
+        for phase, rows in totals.items():
+            self.stdout.write(self.style.SUCCESS(f'{phase}: {rows}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с'
+        ))
@@ -0,0 +1,95 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from foodgram.constants import RECIPE_NDJSON_CHUNK_SIZE
+from recipes.ndjson import RecipeImporter, RecipeImportError
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает рецепты из NDJSON порциями; после сбоя импорт '
+        'продолжается с последней сохранённой порции (--resume)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл NDJSON')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=RECIPE_NDJSON_CHUNK_SIZE
+        )
+        parser.add_argument(
+            '--author',
+            help='Почта автора для рецептов, чей автор не найден'
+        )
+        parser.add_argument(
+            '--create-ingredients',
+            action='store_true',
+            help='Добавлять в каталог отсутствующие ингредиенты'
+        )
+        parser.add_argument(
+            '--media-dir',
+            help='Каталог с файлами изображений из выгрузки'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить с места, сохранённого в файле прогресса'
+        )
+        parser.add_argument(
+            '--state-file',
+            help='Файл прогресса (по умолчанию <path>.progress)'
+        )
+
+    def handle(self, *args, **options):
+        state_file = options['state_file'] or f'{options["path"]}.progress'
+        start_line = 0
+        if options['resume'] and os.path.exists(state_file):
+            with open(state_file, encoding='utf-8') as file:
+                start_line = json.load(file)['line']
+            self.stdout.write(f'Продолжаем после строки {start_line}')
+
+        default_author = None
+        if options['author']:
+            default_author = User.objects.filter(
+                email=options['author']
+            ).first()
+            if default_author is None:
+                raise CommandError(f'Нет пользователя {options["author"]}')
+
+        importer = RecipeImporter(
+            chunk_size=options['chunk_size'],
+            default_author=default_author,
+            create_ingredients=options['create_ingredients'],
+            media_dir=options['media_dir'],
+        )
+        started = time.monotonic()
+
+        def checkpoint(line, imported):
+            # Файл подменяется атомарно, чтобы сбой не оставил его пустым
+            with open(f'{state_file}.tmp', 'w', encoding='utf-8') as file:
+                json.dump({'line': line}, file)
+            os.replace(f'{state_file}.tmp', state_file)
+            if options['verbosity'] >= 2:
+                self.stdout.write(
+                    f'Строка {line}: {imported} рецептов, '
+                    f'{time.monotonic() - started:.1f} с'
+                )
+
+        try:
+            with open(options['path'], encoding='utf-8') as lines:
+                imported = importer.run(lines, start_line, checkpoint)
+        except RecipeImportError as error:
+            raise CommandError(
+                f'{error}. Исправьте строку и запустите команду с --resume'
+            )
+        if os.path.exists(state_file):
+            os.remove(state_file)
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено рецептов: {imported} '
+            f'за {time.monotonic() - started:.1f} с'
+        ))
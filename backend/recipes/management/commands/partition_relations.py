@@ -0,0 +1,146 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.backends.utils import truncate_name
+from django.db.models import UniqueConstraint
+
+from foodgram.constants import RELATION_PARTITIONS
+from recipes.models import FavoriteRecipe, ShoppingList
+from users.models import Follow
+
+# Таблицы связей и поле пользователя, по которому они секционируются:
+# все горячие запросы к ним идут с условием на это поле
+PARTITIONED_TABLES = (
+    (FavoriteRecipe, 'user'),
+    (ShoppingList, 'user'),
+    (Follow, 'follower'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Переводит таблицы избранного, списков покупок и подписок '
+        'на хеш-секционирование по id пользователя (только PostgreSQL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--partitions',
+            type=int,
+            default=RELATION_PARTITIONS,
+            help='Число секций каждой таблицы'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только вывести SQL'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError(
+                'Секционирование поддерживается только на PostgreSQL'
+            )
+        if options['partitions'] < 2:
+            raise CommandError('Нужно хотя бы две секции')
+        for model, key in PARTITIONED_TABLES:
+            table = model._meta.db_table
+            if self._is_partitioned(table):
+                self.stdout.write(f'{table}: уже секционирована')
+                continue
+            statements = self._statements(model, key, options['partitions'])
+            if options['dry_run']:
+                self.stdout.write(';\n'.join(statements) + ';')
+                continue
+            # Таблица переписывается целиком под эксклюзивной блокировкой
+            with transaction.atomic(), connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+            self.stdout.write(self.style.SUCCESS(
+                f'{table}: {options["partitions"]} секций'
+            ))
+
+    def _is_partitioned(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT 1 FROM pg_partitioned_table '
+                'WHERE partrelid = to_regclass(%s)',
+                [connection.ops.quote_name(table)],
+            )
+            return cursor.fetchone() is not None
+
+    def _name(self, *parts):
+        return truncate_name(
+            '_'.join(parts), connection.ops.max_name_length()
+        )
+
+    def _statements(self, model, key, partitions):
+        """SQL переноса таблицы в секционированную с тем же именем.
+
+        Первичный ключ и ограничения уникальности секционированной таблицы
+        обязаны включать ключ секционирования, поэтому первичный ключ
+        становится составным (id, user_id). Ограничения и индексы создаются
+        после копирования данных: так копирование идёт быстрее.
+        """
+        quote = connection.ops.quote_name
+        table = model._meta.db_table
+        old_table = f'{table}_unpartitioned'
+        pk = model._meta.pk.column
+        key_column = model._meta.get_field(key).column
+        statements = [
+            f'LOCK TABLE {quote(table)} IN ACCESS EXCLUSIVE MODE',
+            f'ALTER TABLE {quote(table)} RENAME TO {quote(old_table)}',
+            f'CREATE TABLE {quote(table)} (LIKE {quote(old_table)} '
+            f'INCLUDING DEFAULTS INCLUDING IDENTITY) '
+            f'PARTITION BY HASH ({quote(key_column)})',
+        ]
+        statements.extend(
+            f'CREATE TABLE {quote(self._name(table, f"p{remainder}"))} '
+            f'PARTITION OF {quote(table)} '
+            f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+            for remainder in range(partitions)
+        )
+        statements += [
+            f'INSERT INTO {quote(table)} SELECT * FROM {quote(old_table)}',
+            f'DROP TABLE {quote(old_table)}',
+            f'ALTER TABLE {quote(table)} ADD CONSTRAINT '
+            f'{quote(self._name(table, "pkey"))} '
+            f'PRIMARY KEY ({quote(pk)}, {quote(key_column)})',
+        ]
+        for constraint in model._meta.constraints:
+            if not isinstance(constraint, UniqueConstraint):
+                continue
+            name = constraint.name % {
+                'app_label': model._meta.app_label,
+                'class': model.__name__.lower(),
+            }
+            columns = ', '.join(
+                quote(model._meta.get_field(field).column)
+                for field in constraint.fields
+            )
+            statements.append(
+                f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} '
+                f'UNIQUE ({columns})'
+            )
+        for field in model._meta.local_fields:
+            if not field.remote_field:
+                continue
+            target = field.target_field
+            statements.append(
+                f'ALTER TABLE {quote(table)} ADD CONSTRAINT '
+                f'{quote(self._name(table, field.column, "fk"))} '
+                f'FOREIGN KEY ({quote(field.column)}) '
+                f'REFERENCES {quote(target.model._meta.db_table)} '
+                f'({quote(target.column)}) DEFERRABLE INITIALLY DEFERRED'
+            )
+            # Ключ секционирования уже покрыт ограничением уникальности
+            if field.column != key_column:
+                statements.append(
+                    f'CREATE INDEX {quote(self._name(table, field.column))} '
+                    f'ON {quote(table)} ({quote(field.column)})'
+                )
+        statements.append(
+            f"SELECT setval(pg_get_serial_sequence('{quote(table)}', "
+            f"'{pk}'), COALESCE(MAX({quote(pk)}), 0) + 1, false) "
+            f'FROM {quote(table)}'
+        )
+        return statements
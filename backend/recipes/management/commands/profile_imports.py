@@ -0,0 +1,55 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from foodgram.startup import measure_boot
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает приложение в отдельном процессе с python -X importtime '
+        'и выводит самые медленные импорты'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25)
+        parser.add_argument(
+            '--sort',
+            choices=('cumulative', 'self'),
+            default='cumulative',
+            help='Сортировать по общему времени или по собственному'
+        )
+        parser.add_argument(
+            '--packages',
+            action='store_true',
+            help='Суммировать собственное время по пакетам верхнего уровня'
+        )
+        parser.add_argument(
+            '--no-warm-up',
+            action='store_true',
+            help='Не выполнять прогрев после загрузки'
+        )
+
+    def handle(self, *args, **options):
+        report = measure_boot(
+            warm_up=not options['no_warm_up'], import_time=True
+        )
+        rows = report['importtime']
+        if options['packages']:
+            totals = defaultdict(int)
+            for name, self_us, _ in rows:
+                totals[name.split('.')[0]] += self_us
+            rows = [(name, total, total) for name, total in totals.items()]
+        index = 1 if options['sort'] == 'self' or options['packages'] else 2
+        rows.sort(key=lambda row: row[index], reverse=True)
+
+        self.stdout.write(f'{"своё, мс":>10} {"всего, мс":>10}  модуль')
+        for name, self_us, cumulative_us in rows[:options['top']]:
+            self.stdout.write(
+                f'{self_us / 1000:10.1f} {cumulative_us / 1000:10.1f}  {name}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Загрузка: {report["load_ms"]:.0f} мс, '
+            f'прогрев: {report["warm_up_ms"]:.0f} мс, '
+            f'процесс целиком: {report["process_ms"]:.0f} мс'
+        ))
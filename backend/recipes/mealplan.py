@@ -0,0 +1,88 @@
+# recipes/mealplan.py
+
+"""Сводный список ингредиентов для плана питания.
+
+План — рецепты с множителями порций. Состав всех рецептов плана читается
+одним запросом и суммируется за один проход; результат кэшируется по
+содержимому плана и версиям рецептов, их состава, ингредиентов и
+пользователей из foodgram.events.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+
+from foodgram import events
+from foodgram.constants import MEAL_PLAN_CACHE_KEY, MEAL_PLAN_CACHE_TTL
+from recipes.models import RecipeIngredient
+
+
+def normalize(items):
+    """Складывает порции повторяющихся рецептов: {id рецепта: множитель}."""
+    servings = {}
+    for item in items:
+        servings[item["id"]] = servings.get(item["id"], 0) + item["servings"]
+    return servings
+
+
+def _version():
+    # Скрытие автора меняет версию USER: его рецепты выпадают из планов
+    stamps = events.versions(events.RECIPE, events.RECIPE_INGREDIENT,
+                             events.INGREDIENT, events.USER)
+    return ":".join(stamps[entity] for entity in sorted(stamps))
+
+
+def _cache_key(servings):
+    plan = ",".join(
+        f"{pk}:{servings[pk]!r}" for pk in sorted(servings)
+    )
+    digest = hashlib.sha256(f"{_version()}|{plan}".encode()).hexdigest()
+    return MEAL_PLAN_CACHE_KEY.format(digest)
+
+
+def _format_amount(amount):
+    amount = round(amount, 2)
+    return int(amount) if amount == int(amount) else amount
+
+
+def aggregate(servings):
+    """Суммарные количества ингредиентов и список ненайденных рецептов."""
+    totals = {}
+    found = set()
+    rows = RecipeIngredient.objects.filter(
+        recipe_id__in=servings,
+        recipe__author__deleted_at__isnull=True,
+    ).order_by().values_list(
+        "recipe_id", "ingredient_id", "ingredient__name",
+        "ingredient__measurement_unit", "amount",
+    )
+    for recipe_id, ingredient_id, name, unit, amount in rows:
+        found.add(recipe_id)
+        if ingredient_id not in totals:
+            totals[ingredient_id] = [name, unit, 0]
+        totals[ingredient_id][2] += amount * servings[recipe_id]
+    return {
+        "ingredients": [
+            {
+                "id": ingredient_id,
+                "name": name,
+                "measurement_unit": unit,
+                "amount": _format_amount(amount),
+            }
+            for ingredient_id, (name, unit, amount) in sorted(
+                totals.items(), key=lambda item: (item[1][0], item[1][1])
+            )
+        ],
+        "missing": sorted(set(servings) - found),
+    }
+
+
+def get_meal_plan(items):
+    """Сводный список для плана с учётом кэша."""
+    servings = normalize(items)
+    key = _cache_key(servings)
+    result = cache.get(key)
+    if result is None:
+        result = aggregate(servings)
+        cache.set(key, result, MEAL_PLAN_CACHE_TTL)
+    return result
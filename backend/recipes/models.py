@@ -3,6 +3,7 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import Upper
 
 from foodgram.constants import (INGREDIENT_TITLE_MAX_LEN,
                                 INGREDIENT_MIN_QUANTITY,
@@ -33,6 +34,10 @@ class Ingredient(models.Model):
                 name="unique_ingredient"
             )
         ]
+        indexes = [
+            # IngredientFilter ищет по istartswith, то есть по UPPER(name)
+            models.Index(Upper("name"), name="ingredient_upper_name_idx"),
+        ]
         ordering = ("-name",)
 
     def __str__(self):
@@ -105,6 +110,12 @@ class FavoriteRecipe(BaseUserRecipeRelation):
         default_related_name = "favorited_by"
 
 
+class RecipeQuerySet(models.QuerySet):
+    def visible(self):
+        """Рецепты без авторов, удаливших аккаунт."""
+        return self.filter(author__deleted_at__isnull=True)
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
@@ -119,6 +130,8 @@ class Recipe(models.Model):
     image = models.ImageField(
         upload_to=RECIPE_IMAGE_STORAGE_PATH,
         verbose_name="Фотография",
+        # Индекс нужен проверке ссылок перед удалением общего файла
+        db_index=True,
         blank=True
     )
     text = models.TextField(verbose_name="Инструкция приготовления")
@@ -143,12 +156,26 @@ class Recipe(models.Model):
         related_name="favorite_recipes",
         verbose_name="Избранное"
     )
+    short_link_hits = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Переходов по короткой ссылке"
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Кулинарный рецепт"
         verbose_name_plural = "Кулинарные рецепты"
         ordering = ("-publication_date",)
         default_related_name = "recipes"
+        indexes = [
+            # Фильтр по автору с сортировкой по дате публикации
+            models.Index(
+                fields=["author", "-publication_date"],
+                name="recipe_author_pub_date_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} от {self.author}"
@@ -159,4 +186,35 @@ class ShoppingList(BaseUserRecipeRelation):
         verbose_name = "Список покупок"
         verbose_name_plural = "Списки покупок"
         # ИЗМЕНЕНО: default_related_name изменен для соответствия с фильтрами и логикой
-        default_related_name = "shopping_cart_items"
\ No newline at end of file
+        default_related_name = "shopping_cart_items"
+
+
+class ShoppingListArchive(models.Model):
+    """Списки покупок неактивных пользователей, вынесенные из горячей таблицы.
+
+    Строки возвращаются в ShoppingList при следующем входе пользователя.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="archived_shopping_cart_items",
+        verbose_name="Пользователь"
+    )
+    recipe = models.ForeignKey(
+        "Recipe",
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Рецепт"
+    )
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Перенесён в архив"
+    )
+
+    class Meta:
+        verbose_name = "Архивный список покупок"
+        verbose_name_plural = "Архивные списки покупок"
+
+    def __str__(self):
+        return f"{self.user} {self.recipe}"
\ No newline at end of file
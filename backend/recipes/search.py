@@ -0,0 +1,219 @@
+# recipes/search.py
+
+"""Нечёткий поиск ингредиентов по названию.
+
+Нормализованные названия хранятся в памяти процесса отсортированным
+списком, который служит неявным префиксным деревом: узел — префикс,
+его потомки — диапазон списка, найденный двоичным поиском. Обход дерева
+считает строки матрицы Левенштейна для запроса и отсекает ветви, где
+опечаток уже больше допустимого, поэтому время поиска зависит от числа
+похожих префиксов, а не от размера каталога. Первая буква запроса
+должна совпадать с названием.
+
+Результаты ранжируются по расстоянию до начала названия (так «молако»
+находит и «молоко», и «молоко сгущенное»), затем по расстоянию до
+всего названия и по алфавиту. Индекс строится при прогреве и
+обновляется точечно по событиям об изменении ингредиентов из
+foodgram.events.
+"""
+
+import bisect
+import threading
+
+from foodgram.constants import (INGREDIENT_FUZZY_EXACT_PREFIX_LEN,
+                                INGREDIENT_FUZZY_MIN_LENGTH,
+                                INGREDIENT_FUZZY_TWO_TYPOS_LENGTH)
+from foodgram.startup import on_warm_up
+from recipes.models import Ingredient
+
+
+def normalize(name):
+    return " ".join(name.lower().replace("ё", "е").split())
+
+
+def max_distance(query):
+    """Допустимое число опечаток для нормализованного запроса."""
+    if len(query) >= INGREDIENT_FUZZY_TWO_TYPOS_LENGTH:
+        return 2
+    if len(query) >= INGREDIENT_FUZZY_MIN_LENGTH:
+        return 1
+    return 0
+
+
+class IngredientIndex:
+    """Отсортированный список названий ингредиентов с их id."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.names = None
+        self.ids = {}
+        self.keys = {}
+
+    def _add(self, pk, name):
+        name = normalize(name)
+        self.keys[pk] = name
+        self.ids.setdefault(name, []).append(pk)
+
+    def _remove(self, pk):
+        name = self.keys.pop(pk, None)
+        if name is None:
+            return
+        pks = self.ids[name]
+        pks.remove(pk)
+        if not pks:
+            del self.ids[name]
+            del self.names[bisect.bisect_left(self.names, name)]
+
+    def build(self, rows=None):
+        """Строит индекс заново из пар (id, название) или из БД."""
+        if rows is None:
+            rows = Ingredient.objects.order_by().values_list(
+                "pk", "name"
+            ).iterator()
+        with self.lock:
+            self.ids = {}
+            self.keys = {}
+            for pk, name in rows:
+                self._add(pk, name)
+            self.names = sorted(self.ids)
+
+    def update(self, pks):
+        """Перечитывает из БД изменённые и удалённые ингредиенты."""
+        rows = Ingredient.objects.filter(pk__in=pks).values_list("pk", "name")
+        with self.lock:
+            if self.names is None:
+                return
+            for pk in pks:
+                self._remove(pk)
+            for pk, name in rows:
+                self._add(pk, name)
+                name = self.keys[pk]
+                if len(self.ids[name]) == 1:
+                    bisect.insort(self.names, name)
+
+    def reset(self):
+        with self.lock:
+            self.names = None
+            self.ids = {}
+            self.keys = {}
+
+    def changed(self, entity, pks):
+        if pks is None:
+            self.reset()
+        else:
+            self.update(pks)
+
+    def search(self, query, limit):
+        """id до limit ингредиентов, наиболее похожих на запрос."""
+        query = normalize(query)
+        if self.names is None:
+            self.build()
+        with self.lock:
+            pks = []
+            for name in _Search(self.names, query, limit).run():
+                pks.extend(self.ids[name])
+        return pks[:limit]
+
+
+class _Search:
+    """Обход неявного префиксного дерева с матрицей Левенштейна."""
+
+    def __init__(self, names, query, limit):
+        self.names = names
+        self.query = query
+        self.limit = limit
+        self.distance = max_distance(query)
+        self.depth = len(query) + self.distance
+        # {название: (расстояние до начала, расстояние до всего названия)}
+        self.found = {}
+
+    def run(self):
+        # Как и prefix_length в нечётких запросах Elasticsearch: опечатки
+        # в первых символах не ищутся, иначе обход затронул бы все
+        # короткие префиксы каталога
+        prefix = self.query[:INGREDIENT_FUZZY_EXACT_PREFIX_LEN]
+        row = [min(column, self.distance + 1)
+               for column in range(len(self.query) + 1)]
+        for depth, char in enumerate(prefix, 1):
+            row, _ = self._row(row, char, depth)
+        lo = bisect.bisect_left(self.names, prefix)
+        hi = bisect.bisect_left(self.names, prefix + "\U0010ffff", lo)
+        if row[-1] <= self.distance:
+            self._collect(prefix, lo, hi, row[-1])
+        self._match(prefix, lo, hi, row)
+        ranked = sorted(self.found, key=lambda name: (*self.found[name], name))
+        return ranked[:self.limit]
+
+    def _row(self, previous, char, depth):
+        """Следующая строка матрицы и её минимум.
+
+        Клетки дальше distance от диагонали всё равно больше distance,
+        поэтому считается только полоса вокруг неё.
+        """
+        query = self.query
+        cap = self.distance + 1
+        row = previous[:]
+        best = row[0] = depth if depth < cap else cap
+        first = depth - self.distance
+        if first > 1:
+            row[first - 1] = cap
+        else:
+            first = 1
+        last = depth + self.distance
+        if last > len(query):
+            last = len(query)
+        for column in range(first, last + 1):
+            cost = previous[column - 1] + (query[column - 1] != char)
+            left = row[column - 1] + 1
+            up = previous[column] + 1
+            if left < cost:
+                cost = left
+            if up < cost:
+                cost = up
+            if cost > cap:
+                cost = cap
+            row[column] = cost
+            if cost < best:
+                best = cost
+        return row, best
+
+    def _match(self, prefix, lo, hi, row):
+        names = self.names
+        distance = self.distance
+        depth = len(prefix) + 1
+        position = lo
+        if position < hi and len(names[position]) < depth:
+            # Название, совпадающее с префиксом, учтено в _collect
+            position += 1
+        while position < hi:
+            char = names[position][depth - 1]
+            end = bisect.bisect_left(
+                names, prefix + chr(ord(char) + 1), position, hi
+            )
+            child, best = self._row(row, char, depth)
+            if best <= distance:
+                branch = prefix + char
+                if child[-1] <= distance:
+                    self._collect(branch, position, end, child[-1])
+                if depth < self.depth:
+                    self._match(branch, position, end, child)
+            position = end
+
+    def _collect(self, prefix, lo, hi, distance):
+        # Внутри диапазона названия идут по алфавиту, и дальше первых
+        # limit ни одно из них в выдачу не попадёт
+        found = self.found
+        missed = self.distance + 1
+        for name in self.names[lo:min(hi, lo + self.limit)]:
+            match = (distance, distance if len(name) == len(prefix)
+                     else missed)
+            if match < found.get(name, (missed, missed)):
+                found[name] = match
+
+
+ingredients = IngredientIndex()
+
+
+@on_warm_up
+def build_ingredient_index():
+    ingredients.build()
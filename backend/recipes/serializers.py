@@ -4,7 +4,10 @@ from rest_framework import serializers
 
 from api.fields import Base64ImageField
 from api.serializers import UserReadSerializer
-from foodgram.constants import INGREDIENT_RECIPE_MIN_AMOUNT
+from foodgram import events, membership
+from foodgram.constants import (INGREDIENT_RECIPE_MIN_AMOUNT,
+                                MEAL_PLAN_MAX_RECIPES, MEAL_PLAN_MAX_SERVINGS)
+from recipes.jobs import delete_files_later
 from recipes.models import (FavoriteRecipe, Ingredient, RecipeIngredient, Recipe,
                             ShoppingList)
 
@@ -33,7 +36,18 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit', 'amount')
 
 
-class RecipeListSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """Оставляет в сериализаторе только поля из context["fields"]."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get("fields")
+        if requested is not None:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+
+class RecipeListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     author = UserReadSerializer(read_only=True)
     # ИЗМЕНЕНО: source указывает на новый related_name
     ingredients = RecipeIngredientSerializer(many=True, source='ingredients_in_recipe')
@@ -57,19 +71,13 @@ class RecipeListSerializer(serializers.ModelSerializer):
         )
 
     def get_is_favorited(self, obj):
-        request = self.context.get("request")
-        return (
-            request and
-            request.user.is_authenticated and
-            FavoriteRecipe.objects.filter(user=request.user, recipe=obj).exists()
+        return obj.pk in membership.favorites.for_request(
+            self.context.get("request")
         )
 
     def get_is_in_shopping_cart(self, obj):
-        request = self.context.get("request")
-        return (
-            request and
-            request.user.is_authenticated and
-            ShoppingList.objects.filter(user=request.user, recipe=obj).exists()
+        return obj.pk in membership.shopping_cart.for_request(
+            self.context.get("request")
         )
 
 
@@ -141,9 +149,10 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             )
             for item in ingredients_data
         ])
+        # bulk_create не отправляет сигналов
+        events.publish(events.RECIPE_INGREDIENT, recipe.pk)
 
     def create(self, validated_data):
-        validated_data['author'] = self.context['request'].user
         ingredients_data = validated_data.pop("ingredients")
         recipe = Recipe.objects.create(
             **validated_data,
@@ -158,8 +167,13 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             ingredients_data = validated_data.pop("ingredients")
             instance.ingredients_in_recipe.all().delete()
             self._create_ingredients(instance, ingredients_data)
-        
-        return super().update(instance, validated_data)
+
+        # Заменённая фотография удаляется фоновой задачей
+        old_image = instance.image.name
+        recipe = super().update(instance, validated_data)
+        if recipe.image.name != old_image:
+            delete_files_later(old_image)
+        return recipe
 
 
 class RecipeMinifiedSerializer(serializers.ModelSerializer):
@@ -204,4 +218,26 @@ class ShoppingListSerializer(BaseUserRecipeRelationSerializer):
     def validate(self, data):
         return self._validate_relation(
             ShoppingList, data, "Рецепт уже есть в списке покупок."
-        )
\ No newline at end of file
+        )
+
+
+class MealPlanItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField(min_value=1)
+    servings = serializers.FloatField(
+        min_value=0, max_value=MEAL_PLAN_MAX_SERVINGS, default=1
+    )
+
+    def validate_servings(self, value):
+        if value <= 0:
+            raise serializers.ValidationError(
+                "Число порций должно быть больше нуля."
+            )
+        return value
+
+
+class MealPlanSerializer(serializers.Serializer):
+    """План питания: рецепты с множителями порций."""
+
+    recipes = MealPlanItemSerializer(
+        many=True, allow_empty=False, max_length=MEAL_PLAN_MAX_RECIPES
+    )
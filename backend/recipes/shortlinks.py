@@ -0,0 +1,121 @@
+# recipes/shortlinks.py
+
+"""Короткие ссылки на рецепты.
+
+Код ссылки — id рецепта в base62, поэтому его не нужно хранить. Проверенные
+коды держатся в LRU-кэше процесса, и повторные переходы не обращаются к БД.
+Счётчики переходов копятся в памяти и записываются в БД пачками.
+"""
+
+import atexit
+import string
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.db import DatabaseError
+from django.db.models import F
+
+from foodgram.caches import LRUCache
+from foodgram.constants import (SHORT_LINK_CACHE_SIZE, SHORT_LINK_CACHE_TTL,
+                                SHORT_LINK_FLUSH_INTERVAL,
+                                SHORT_LINK_FLUSH_SIZE)
+from recipes.models import Recipe
+
+ALPHABET = string.digits + string.ascii_letters
+BASE = len(ALPHABET)
+INDEX = {char: index for index, char in enumerate(ALPHABET)}
+
+
+def encode(pk):
+    """Код короткой ссылки для id рецепта."""
+    if pk < 0:
+        raise ValueError("id рецепта не может быть отрицательным")
+    code = ""
+    while True:
+        pk, remainder = divmod(pk, BASE)
+        code = ALPHABET[remainder] + code
+        if not pk:
+            return code
+
+
+def decode(code):
+    """id рецепта по коду; ValueError для некорректного кода.
+
+    Принимается только код из encode(): с ведущими нулями у каждого
+    рецепта были бы сколько угодно псевдонимов, и forget_short_links
+    не смог бы убрать их из кэша.
+    """
+    if (not code or len(code) > 11
+            or (len(code) > 1 and code[0] == ALPHABET[0])):
+        raise ValueError(f"Некорректный код ссылки: {code!r}")
+    pk = 0
+    for char in code:
+        if char not in INDEX:
+            raise ValueError(f"Некорректный код ссылки: {code!r}")
+        pk = pk * BASE + INDEX[char]
+    return pk
+
+
+def recipe_path(pk):
+    """Страница рецепта во фронтенде."""
+    return f"/recipes/{pk}"
+
+
+class HitCounter:
+    """Буфер счётчиков переходов, сбрасываемый в БД пачками."""
+
+    def __init__(self, flush_size, flush_interval):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._hits = Counter()
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, pk):
+        """Учитывает переход; True, если буфер пора сбросить."""
+        with self._lock:
+            self._hits[pk] += 1
+            self._pending += 1
+            return (
+                self._pending >= self.flush_size
+                or time.monotonic() - self._flushed_at >= self.flush_interval
+            )
+
+    def flush(self):
+        """Записывает накопленные переходы одним UPDATE на каждое значение."""
+        with self._lock:
+            hits, self._hits = self._hits, Counter()
+            self._pending = 0
+            self._flushed_at = time.monotonic()
+        by_count = defaultdict(list)
+        for pk, count in hits.items():
+            by_count[count].append(pk)
+        for count, pks in by_count.items():
+            Recipe.objects.filter(pk__in=pks).update(
+                short_link_hits=F("short_link_hits") + count
+            )
+        return sum(hits.values())
+
+
+targets = LRUCache(SHORT_LINK_CACHE_SIZE, SHORT_LINK_CACHE_TTL)
+hit_counter = HitCounter(SHORT_LINK_FLUSH_SIZE, SHORT_LINK_FLUSH_INTERVAL)
+
+
+@atexit.register
+def _flush_on_exit():
+    # При остановке воркера остаток буфера не должен теряться
+    try:
+        hit_counter.flush()
+    except DatabaseError:
+        pass
+
+
+def forget_short_links(entity, recipe_ids):
+    """Убирает изменённые рецепты из кэша этого процесса."""
+    if recipe_ids is None:
+        targets.clear()
+        return
+    for recipe_id in recipe_ids:
+        targets.delete(encode(recipe_id))
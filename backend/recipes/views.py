@@ -1,9 +1,11 @@
 # recipes/views.py
 
-from django.db.models import Sum
-from django.http import HttpResponse
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch, Sum
+from django.http import (HttpResponse, HttpResponseNotAllowed,
+                         HttpResponseRedirect, JsonResponse)
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import status, viewsets
+from rest_framework import exceptions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
@@ -13,13 +15,86 @@ from django.urls import reverse
 
 from api.pagination import CustomPageNumberPagination
 from api.permissions import IsOwnerOrReadOnly
+from foodgram.constants import RECIPE_BATCH_MAX_SIZE
+from foodgram.db.routing import replica_read
+from recipes import mealplan, search, shortlinks
 from recipes.filters import IngredientFilter, RecipeFilter
 from recipes.models import (FavoriteRecipe, Ingredient, RecipeIngredient, Recipe,
                             ShoppingList)
 # ИЗМЕНЕНО: импорты сериализаторов обновлены
 from recipes.serializers import (RecipeCreateSerializer, FavoriteSerializer,
                                  RecipeListSerializer, ShoppingListSerializer,
-                                 BasicIngredientSerializer, RecipeMinifiedSerializer)
+                                 BasicIngredientSerializer, RecipeMinifiedSerializer,
+                                 MealPlanSerializer)
+
+INGREDIENT_FIELDS = ("id", "name", "measurement_unit")
+SAFE_METHODS = ("GET", "HEAD")
+# Действия, отдающие рецепты целиком через RecipeListSerializer
+READ_ACTIONS = ("list", "retrieve", "batch")
+# Тот же формат, что у JSONRenderer из DRF
+JSON_DUMPS_PARAMS = {"ensure_ascii": False, "separators": (",", ":")}
+
+
+def _not_found():
+    return JsonResponse(
+        {"detail": str(exceptions.NotFound.default_detail)},
+        status=status.HTTP_404_NOT_FOUND,
+        json_dumps_params=JSON_DUMPS_PARAMS,
+    )
+
+
+@replica_read
+async def ingredient_list(request):
+    """Асинхронный аналог IngredientViewSet.list для ASGI-режима."""
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(SAFE_METHODS)
+    if "fuzzy" in request.GET and search.ingredients.names is None:
+        # Индекс строится запросом к БД, недопустимым в цикле событий
+        await sync_to_async(search.ingredients.build)()
+    queryset = IngredientFilter(
+        request.GET, queryset=Ingredient.objects.all()
+    ).qs.values(*INGREDIENT_FIELDS)
+    return JsonResponse(
+        [item async for item in queryset],
+        safe=False,
+        json_dumps_params=JSON_DUMPS_PARAMS,
+    )
+
+
+@replica_read
+async def ingredient_detail(request, pk):
+    """Асинхронный аналог IngredientViewSet.retrieve для ASGI-режима."""
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(SAFE_METHODS)
+    ingredient = await Ingredient.objects.filter(pk=pk).values(
+        *INGREDIENT_FIELDS
+    ).afirst()
+    if ingredient is None:
+        return _not_found()
+    return JsonResponse(ingredient, json_dumps_params=JSON_DUMPS_PARAMS)
+
+
+async def recipe_short_link(request, code):
+    """Перенаправляет короткую ссылку на страницу рецепта во фронтенде.
+
+    Для уже проверенных кодов БД не используется: цель берётся из кэша,
+    а переход засчитывается в буфер, который изредка сбрасывается в БД.
+    """
+    target = shortlinks.targets.get(code)
+    if target is None:
+        try:
+            pk = shortlinks.decode(code)
+        except ValueError:
+            return _not_found()
+        if not await Recipe.objects.visible().filter(pk=pk).aexists():
+            return _not_found()
+        target = (pk, shortlinks.recipe_path(pk))
+        shortlinks.targets.set(code, target)
+    pk, path = target
+    if shortlinks.hit_counter.add(pk):
+        await sync_to_async(shortlinks.hit_counter.flush)()
+    return HttpResponseRedirect(path)
+
 
 class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
@@ -27,30 +102,120 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = (AllowAny,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
+    replica_actions = ("list", "retrieve")
     # Убираем search_fields, т.к. фильтрация уже определена в IngredientFilter
     # search_fields = ("^name",)
 
 
 class RecipeViewSet(viewsets.ModelViewSet):
-    queryset = Recipe.objects.all().order_by('-publication_date')
+    queryset = Recipe.objects.visible().order_by('-publication_date')
     pagination_class = CustomPageNumberPagination
     permission_classes = (IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    replica_actions = READ_ACTIONS
+    # Лимиты эндпоинтов: throttle_scope задаётся в @action, для
+    # стандартных действий — через throttle_scopes
+    throttle_scope = None
+    throttle_scopes = {"create": "recipe_create"}
+
+    def _query_param_set(self, name):
+        value = self.request.query_params.get(name, "")
+        return {item.strip() for item in value.split(",") if item.strip()}
+
+    def get_requested_fields(self):
+        """Поля ответа с учётом параметров fields, omit и expand.
+
+        fields задаёт список полей, expand добавляет к нему вложенные
+        объекты (например, ?fields=id,name,image&expand=author), omit
+        исключает поля. Без параметров возвращаются все поля.
+        """
+        all_fields = RecipeListSerializer.Meta.fields
+        fields = self._query_param_set("fields")
+        if fields:
+            fields |= self._query_param_set("expand")
+        else:
+            fields = set(all_fields)
+        fields -= self._query_param_set("omit")
+        return tuple(field for field in all_fields if field in fields)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in READ_ACTIONS:
+            return queryset
+        # Связанные данные загружаются только для запрошенных полей
+        # Флаги избранного, списка покупок и подписки на автора
+        # проверяются по индексам из foodgram.membership
+        fields = self.get_requested_fields()
+        if "author" in fields:
+            queryset = queryset.select_related("author")
+        if "ingredients" in fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                "ingredients_in_recipe",
+                queryset=RecipeIngredient.objects.select_related(
+                    "ingredient"
+                ).order_by(),
+            ))
+        return queryset
 
     def get_serializer_class(self):
         # ИЗМЕНЕНО: сериализаторы для разных действий
-        if self.action in ("list", "retrieve"):
+        if self.action in READ_ACTIONS:
             return RecipeListSerializer
         return RecipeCreateSerializer
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context["request"] = self.request
+        if self.action in READ_ACTIONS:
+            context["fields"] = self.get_requested_fields()
         return context
 
+    def _get_batch_ids(self):
+        ids = []
+        for value in self.request.query_params.get("ids", "").split(","):
+            value = value.strip()
+            if not value:
+                continue
+            if not value.isdigit():
+                raise exceptions.ValidationError(
+                    {"ids": f"Некорректный id рецепта: {value}"}
+                )
+            if int(value) not in ids:
+                ids.append(int(value))
+        if not ids:
+            raise exceptions.ValidationError(
+                {"ids": "Укажите id рецептов через запятую"}
+            )
+        if len(ids) > RECIPE_BATCH_MAX_SIZE:
+            raise exceptions.ValidationError({"ids": (
+                f"Можно запросить не больше {RECIPE_BATCH_MAX_SIZE} рецептов"
+            )})
+        return ids
+
+    @action(
+        detail=False,
+        methods=["get",],
+        permission_classes=[AllowAny],
+        url_path="batch",
+    )
+    def batch(self, request):
+        """Рецепты по списку id (?ids=3,1,2) в порядке запроса.
+
+        Ненайденные id возвращаются в поле missing.
+        """
+        ids = self._get_batch_ids()
+        recipes = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [recipes[pk] for pk in ids if pk in recipes], many=True
+        )
+        return Response({
+            "results": serializer.data,
+            "missing": [pk for pk in ids if pk not in recipes],
+        })
+
     def _add_or_remove_relation(self, request, pk, serializer_class, model_class, error_message):
-        recipe = get_object_or_404(Recipe, pk=pk)
+        recipe = get_object_or_404(Recipe.objects.visible(), pk=pk)
         
         if request.method == "POST":
             if model_class.objects.filter(user=request.user, recipe=recipe).exists():
@@ -100,12 +265,14 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated],
         # ИЗМЕНЕНО: url_path соответствует спецификации
         url_path="download_shopping_cart",
+        throttle_scope="shopping_cart_download",
     )
     def download_shopping_cart(self, request):
         ingredients = (
             RecipeIngredient.objects.filter(
                 # ИЗМЕНЕНО: shopping_cart_items - новый related_name
-                recipe__shopping_cart_items__user=request.user
+                recipe__shopping_cart_items__user=request.user,
+                recipe__author__deleted_at__isnull=True,
             )
             .values("ingredient__name", "ingredient__measurement_unit")
             .annotate(total=Sum("amount"))
@@ -122,6 +289,25 @@ class RecipeViewSet(viewsets.ModelViewSet):
         response['Content-Disposition'] = 'attachment; filename="shopping_list.txt"'
         return response
 
+    @action(
+        detail=False,
+        methods=["post",],
+        permission_classes=[AllowAny],
+        url_path="meal_plan",
+        throttle_scope="meal_plan",
+    )
+    def meal_plan(self, request):
+        """Сводный список ингредиентов для плана питания.
+
+        Тело запроса: {"recipes": [{"id": 1, "servings": 2}, ...]};
+        количества умножаются на число порций и суммируются.
+        """
+        serializer = MealPlanSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            mealplan.get_meal_plan(serializer.validated_data["recipes"])
+        )
+
     @action(
         detail=True,
         methods=["get",],
@@ -131,7 +317,10 @@ class RecipeViewSet(viewsets.ModelViewSet):
     )
     def get_short_link(self, request, pk=None):
         # ИЗМЕНЕНО: генерация короткой ссылки через reverse
-        short_link = request.build_absolute_uri(reverse('recipe-short-link', kwargs={'pk': pk}))
+        recipe = get_object_or_404(Recipe.objects.visible(), pk=pk)
+        short_link = request.build_absolute_uri(reverse(
+            'recipe-short-link', kwargs={'code': shortlinks.encode(recipe.pk)}
+        ))
         return Response({
             "short-link": short_link
         })
\ No newline at end of file
@@ -0,0 +1,7 @@
+from foodgram.db.routing import ReplicaRouter
+
+
+class TestReplicaRouter(ReplicaRouter):
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
@@ -0,0 +1,21 @@
+"""Настройки для запуска тестов: python manage.py test --settings=tests.settings.
+
+Файлы миграций генерируются при развёртывании, поэтому тестовая БД
+создаётся прямо по моделям.
+"""
+
+from foodgram.settings import *  # noqa: F401,F403
+from foodgram.settings import DATABASES, INSTALLED_APPS
+
+SECRET_KEY = "tests"
+DATABASES["default"]["NAME"] = DATABASES["default"]["NAME"] or "tests.sqlite3"
+MIGRATION_MODULES = {
+    app.split(".apps.")[0].rsplit(".", 1)[-1]: None for app in INSTALLED_APPS
+}
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# Вторая SQLite-база изображает реплику в тестах маршрутизации. Реплики
+# получают схему репликацией, а здесь её создаёт тестовый раннер, поэтому
+# маршрутизатор тестов разрешает миграции во все базы.
+DATABASES["replica"] = {**DATABASES["default"], "NAME": "tests_replica.sqlite3"}
+DATABASE_ROUTERS = ["tests.routing.TestReplicaRouter"]
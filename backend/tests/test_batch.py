@@ -0,0 +1,83 @@
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from foodgram.constants import RECIPE_BATCH_MAX_SIZE
+from recipes.models import Recipe
+from users.models import User
+
+URL = '/api/recipes/batch/'
+
+
+class RecipeBatchTests(APITestCase):
+
+    def setUp(self):
+        self.author = self.create_user('author')
+        self.recipes = [self.create_recipe(self.author, f'Рецепт {index}')
+                        for index in range(3)]
+
+    def create_user(self, username, **fields):
+        return User.objects.create_user(
+            username=username, email=f'{username}@example.com',
+            password='pass', first_name='Name', last_name='Name', **fields,
+        )
+
+    def create_recipe(self, author, name):
+        return Recipe.objects.create(
+            author=author, name=name, text='Сварить.', cooking_time=10,
+        )
+
+    def batch(self, ids, **params):
+        return self.client.get(
+            URL, {'ids': ','.join(str(pk) for pk in ids), **params}
+        )
+
+    def test_results_keep_requested_order(self):
+        first, second, third = (recipe.pk for recipe in self.recipes)
+
+        response = self.batch([third, first, second, third])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['results']],
+                         [third, first, second])
+        self.assertEqual(response.data['missing'], [])
+
+    def test_unknown_ids_are_missing(self):
+        response = self.batch([999999, self.recipes[0].pk, 999998])
+
+        self.assertEqual([item['id'] for item in response.data['results']],
+                         [self.recipes[0].pk])
+        self.assertEqual(response.data['missing'], [999999, 999998])
+
+    def test_hidden_authors_are_excluded(self):
+        hidden = self.create_user('hidden', deleted_at=timezone.now(),
+                                  is_active=False)
+        recipe = self.create_recipe(hidden, 'Скрытый')
+
+        response = self.batch([recipe.pk, self.recipes[0].pk])
+
+        self.assertEqual([item['id'] for item in response.data['results']],
+                         [self.recipes[0].pk])
+        self.assertEqual(response.data['missing'], [recipe.pk])
+
+    def test_id_count_is_capped(self):
+        ids = range(1, RECIPE_BATCH_MAX_SIZE + 1)
+
+        self.assertEqual(self.batch(ids).status_code, status.HTTP_200_OK)
+        response = self.batch([*ids, RECIPE_BATCH_MAX_SIZE + 1])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ids', response.data)
+
+    def test_invalid_ids_are_rejected(self):
+        for ids in ('', '1,x', '-1'):
+            with self.subTest(ids=ids):
+                response = self.client.get(URL, {'ids': ids})
+                self.assertEqual(response.status_code,
+                                 status.HTTP_400_BAD_REQUEST)
+
+    def test_fields_are_selectable(self):
+        response = self.batch([self.recipes[0].pk], fields='id,name',
+                              expand='author')
+
+        self.assertEqual(set(response.data['results'][0]),
+                         {'id', 'name', 'author'})
@@ -0,0 +1,43 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from foodgram.constants import USER_ME_CACHE_KEY
+from users.models import User
+
+
+class CurrentUserCacheTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='reader', email='reader@example.com', password='pass',
+            first_name='Reader', last_name='Reader',
+        )
+        self.client.force_authenticate(self.user)
+        self.key = USER_ME_CACHE_KEY.format(self.user.pk)
+
+    def test_process_local_cache_is_not_used(self):
+        response = self.client.get('/api/users/me/')
+
+        self.assertEqual(response.data['first_name'], 'Reader')
+        self.assertIsNone(cache.get(self.key))
+
+    def test_shared_cache_keeps_snapshot(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        shared = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        }}
+        with override_settings(CACHES=shared):
+            self.client.get('/api/users/me/')
+            self.assertIsNotNone(cache.get(self.key))
+
+            self.user.first_name = 'Writer'
+            self.user.save()
+            response = self.client.get('/api/users/me/')
+
+        self.assertEqual(response.data['first_name'], 'Writer')
@@ -0,0 +1,136 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from foodgram import events
+from foodgram.constants import (
+    EVENTS_LOG_KEY, EVENTS_LOG_SIZE, EVENTS_SEQUENCE_KEY
+)
+
+ENTITY = 'tests'
+
+
+class EventsTests(TransactionTestCase):
+    # publish() откладывает события до настоящего COMMIT
+
+    def setUp(self):
+        caches[settings.EVENTS_CACHE_ALIAS].clear()
+        self.received = []
+        events.subscribe(ENTITY, self.record)
+        self.addCleanup(events._subscribers[ENTITY].remove, self.record)
+        last_seen = events._state['last_seen']
+        self.addCleanup(events._state.update, last_seen=last_seen)
+        events._state['last_seen'] = None
+
+    def record(self, entity, keys):
+        self.received.append((entity, keys))
+
+    def test_events_of_transaction_are_coalesced(self):
+        with transaction.atomic():
+            events.publish(ENTITY, 1)
+            events.publish(ENTITY, 2, 1)
+            events.publish(ENTITY, 2)
+            self.assertEqual(self.received, [])
+
+        self.assertEqual(self.received, [(ENTITY, {1, 2})])
+
+    def test_publish_without_keys_wins(self):
+        with transaction.atomic():
+            events.publish(ENTITY, 1)
+            events.publish(ENTITY)
+            events.publish(ENTITY, 2)
+
+        self.assertEqual(self.received, [(ENTITY, None)])
+
+    def test_publish_outside_transaction_is_immediate(self):
+        events.publish(ENTITY, 3)
+
+        self.assertEqual(self.received, [(ENTITY, {3})])
+
+    def test_rollback_discards_events(self):
+        before = events.version(ENTITY, 1)
+        with self.assertRaises(ZeroDivisionError):
+            with transaction.atomic():
+                events.publish(ENTITY, 1)
+                1 / 0
+        with transaction.atomic():
+            events.publish(ENTITY, 2)
+
+        self.assertEqual(self.received, [(ENTITY, {2})])
+        self.assertEqual(events.version(ENTITY, 1), before)
+
+    def test_versions_change_after_commit(self):
+        entity = events.version(ENTITY)
+        first = events.version(ENTITY, 1)
+        second = events.version(ENTITY, 2)
+
+        with transaction.atomic():
+            events.publish(ENTITY, 1)
+            self.assertEqual(events.version(ENTITY, 1), first)
+
+        self.assertNotEqual(events.version(ENTITY), entity)
+        self.assertNotEqual(events.version(ENTITY, 1), first)
+        self.assertEqual(events.version(ENTITY, 2), second)
+
+        events.publish(ENTITY)
+        self.assertNotEqual(events.version(ENTITY, 2), second)
+
+    def test_sync_replays_other_processes_and_skips_own(self):
+        events.sync()
+        with mock.patch('foodgram.events._origin', return_value='other:1'):
+            events.dispatch({ENTITY: {5}})
+        events.dispatch({ENTITY: {6}})
+        self.received.clear()
+
+        events.sync()
+
+        self.assertEqual(self.received, [(ENTITY, {5})])
+        self.received.clear()
+        events.sync()
+        self.assertEqual(self.received, [])
+
+    def test_first_sync_only_remembers_position(self):
+        with mock.patch('foodgram.events._origin', return_value='other:1'):
+            events.dispatch({ENTITY: {5}})
+        self.received.clear()
+
+        events.sync()
+
+        self.assertEqual(self.received, [])
+
+    def test_missing_log_entry_resets_subscribers(self):
+        events.sync()
+        with mock.patch('foodgram.events._origin', return_value='other:1'):
+            events.dispatch({ENTITY: {5}})
+            events.dispatch({ENTITY: {6}})
+        caches[settings.EVENTS_CACHE_ALIAS].delete(EVENTS_LOG_KEY.format(1))
+        self.received.clear()
+
+        events.sync()
+
+        self.assertEqual(self.received, [(ENTITY, None)])
+
+    def test_log_overflow_resets_subscribers(self):
+        events.sync()
+        caches[settings.EVENTS_CACHE_ALIAS].set(
+            EVENTS_SEQUENCE_KEY, EVENTS_LOG_SIZE + 1, None
+        )
+
+        events.sync()
+
+        self.assertEqual(self.received, [(ENTITY, None)])
+
+    def test_failing_subscriber_does_not_stop_others(self):
+        def broken(entity, keys):
+            raise RuntimeError(entity)
+
+        events._subscribers[ENTITY].insert(0, broken)
+        self.addCleanup(events._subscribers[ENTITY].remove, broken)
+
+        with self.assertLogs('foodgram.events', 'ERROR'):
+            events.publish(ENTITY, 1)
+
+        self.assertEqual(self.received, [(ENTITY, {1})])
@@ -0,0 +1,62 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+# Индекс, который должен оказаться в плане каждого запроса
+EXPECTED_INDEXES = {
+    'sqlite': {
+        'Рецепты автора по дате': 'recipe_author_pub_date_idx (author_id=?)',
+        'Избранное пользователя': (
+            'sqlite_autoindex_recipes_favoriterecipe_1 (user_id=?)'
+        ),
+        'Список покупок пользователя': (
+            'sqlite_autoindex_recipes_shoppinglist_1 (user_id=?)'
+        ),
+        'Подписки пользователя': (
+            'sqlite_autoindex_users_follow_1 (follower_id=?)'
+        ),
+    },
+    'postgresql': {
+        'Рецепты автора по дате': 'recipe_author_pub_date_idx',
+        'Избранное пользователя': 'favoriterecipe_no_duplicate_relations',
+        'Список покупок пользователя': 'shoppinglist_no_duplicate_relations',
+        'Подписки пользователя': 'no_duplicate_follows',
+        'Поиск ингредиента по началу названия': (
+            'ingredient_upper_name_like_idx'
+        ),
+    },
+}
+
+
+class ExplainQueriesTests(TestCase):
+
+    def plans(self):
+        out = StringIO()
+        call_command('explain_queries', '--strict', stdout=out)
+        plans = {}
+        title = None
+        for line in out.getvalue().splitlines():
+            if line.endswith(':'):
+                title = line[:-1]
+                plans[title] = ''
+            else:
+                plans[title] += line + '\n'
+        return plans
+
+    def test_hot_queries_use_intended_indexes(self):
+        expected = EXPECTED_INDEXES[connection.vendor]
+
+        plans = self.plans()
+
+        self.assertEqual(set(plans), set(expected))
+        for title, index in expected.items():
+            with self.subTest(title):
+                self.assertIn(index, plans[title])
+
+    def test_unsupported_vendor_fails(self):
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            with self.assertRaisesMessage(CommandError, 'mysql'):
+                call_command('explain_queries', stdout=StringIO())
@@ -0,0 +1,151 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import enqueue, job
+from jobs.worker import Worker
+
+QUEUE = 'tests'
+calls = []
+
+
+@job('tests.record', queue=QUEUE)
+def record(key):
+    calls.append(key)
+
+
+@job('tests.flaky', queue=QUEUE, max_attempts=3)
+def flaky(key, failures):
+    calls.append(key)
+    if calls.count(key) <= failures:
+        raise ValueError(key)
+
+
+class WorkerTests(TransactionTestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def run_worker(self, **options):
+        options = {'poll_interval': 0.01, 'burst': True, **options}
+        return Worker({QUEUE: 2}, **options).run()
+
+    def test_failed_job_is_retried_with_backoff(self):
+        task = enqueue('tests.flaky', {'key': 'a', 'failures': 1})
+
+        started = timezone.now()
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            self.run_worker(backoff=60)
+        task.refresh_from_db()
+
+        self.assertEqual(task.status, Job.QUEUED)
+        self.assertEqual(task.attempts, 1)
+        self.assertIn('ValueError', task.last_error)
+        self.assertGreaterEqual(task.run_at, started + timedelta(seconds=30))
+        self.assertLessEqual(task.run_at, timezone.now() + timedelta(seconds=60))
+
+        Job.objects.filter(pk=task.pk).update(run_at=timezone.now())
+        self.run_worker(backoff=60)
+        task.refresh_from_db()
+
+        self.assertEqual(task.status, Job.DONE)
+        self.assertEqual(task.attempts, 2)
+        self.assertEqual(calls, ['a', 'a'])
+
+    def test_job_fails_after_max_attempts(self):
+        task = enqueue('tests.flaky', {'key': 'b', 'failures': 10})
+
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            self.run_worker(backoff=0)
+        task.refresh_from_db()
+
+        self.assertEqual(task.status, Job.FAILED)
+        self.assertEqual(task.attempts, 3)
+
+    def test_job_with_expired_lock_is_recovered(self):
+        expired = Job.objects.create(
+            queue=QUEUE, name='tests.record', payload={'key': 'expired'},
+            status=Job.RUNNING, attempts=1, locked_by='crashed',
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+        locked = Job.objects.create(
+            queue=QUEUE, name='tests.record', payload={'key': 'locked'},
+            status=Job.RUNNING, attempts=1, locked_by='alive',
+            locked_until=timezone.now() + timedelta(minutes=5),
+        )
+
+        self.run_worker()
+        expired.refresh_from_db()
+        locked.refresh_from_db()
+
+        self.assertEqual(expired.status, Job.DONE)
+        self.assertEqual(expired.attempts, 2)
+        self.assertEqual(locked.status, Job.RUNNING)
+        self.assertEqual(calls, ['expired'])
+
+    def test_enqueue_with_same_key_runs_once(self):
+        first = enqueue('tests.record', {'key': 'c'}, idempotency_key='c')
+        self.run_worker()
+        second = enqueue('tests.record', {'key': 'c'}, idempotency_key='c')
+        self.run_worker()
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertEqual(calls, ['c'])
+
+    def test_finish_is_retried_after_database_error(self):
+        task = enqueue('tests.record', {'key': 'd'})
+        finish = Worker._finish
+        errors = [OperationalError('database table is locked: jobs_job')]
+
+        def locked_once(worker, *args):
+            if errors:
+                raise errors.pop()
+            return finish(worker, *args)
+
+        with mock.patch.object(Worker, '_finish', locked_once), \
+                mock.patch('jobs.worker.JOB_FINISH_RETRY_DELAY', 0), \
+                self.assertLogs('jobs.worker', 'WARNING'):
+            self.run_worker()
+        task.refresh_from_db()
+
+        self.assertEqual(task.status, Job.DONE)
+        self.assertEqual(calls, ['d'])
+
+    def test_unsaved_result_is_logged(self):
+        task = enqueue('tests.record', {'key': 'e'})
+        error = OperationalError('database table is locked: jobs_job')
+
+        with mock.patch.object(Worker, '_finish', side_effect=error), \
+                mock.patch('jobs.worker.JOB_FINISH_RETRY_DELAY', 0), \
+                self.assertLogs('jobs.worker', 'ERROR') as logs:
+            self.run_worker()
+        task.refresh_from_db()
+
+        self.assertIn(f'#{task.pk}', logs.output[-1])
+        self.assertEqual(task.status, Job.RUNNING)
+
+    def test_cleanup_is_scheduled_once_per_interval(self):
+        old = Job.objects.create(
+            queue=QUEUE, name='tests.record', status=Job.DONE,
+            finished_at=timezone.now() - timedelta(days=8),
+        )
+        recent = Job.objects.create(
+            queue=QUEUE, name='tests.record', status=Job.DONE,
+            finished_at=timezone.now() - timedelta(days=1),
+        )
+        workers = [
+            Worker({'default': 1}, poll_interval=0.01, burst=True,
+                   cleanup_interval=3600, cleanup_days=7)
+            for _ in range(2)
+        ]
+        for worker in workers:
+            worker.run()
+
+        self.assertEqual(Job.objects.filter(name='jobs.cleanup').count(), 1)
+        self.assertFalse(Job.objects.filter(pk=old.pk).exists())
+        self.assertTrue(Job.objects.filter(pk=recent.pk).exists())
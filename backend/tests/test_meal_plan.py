@@ -0,0 +1,104 @@
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from users.models import User
+
+URL = '/api/recipes/meal_plan/'
+
+
+class MealPlanTests(APITransactionTestCase):
+    # Кэш плана сбрасывается событиями, которые рассылаются после COMMIT
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass',
+            first_name='Author', last_name='Author',
+        )
+        self.salt = Ingredient.objects.create(name='соль', measurement_unit='г')
+        self.sugar = Ingredient.objects.create(
+            name='сахар', measurement_unit='г'
+        )
+        self.soup = self.create_recipe('Суп', {self.salt: 10, self.sugar: 5})
+        self.cake = self.create_recipe('Торт', {self.sugar: 100})
+
+    def create_recipe(self, name, amounts, author=None):
+        recipe = Recipe.objects.create(
+            author=author or self.author, name=name, text='Сварить.',
+            cooking_time=10,
+        )
+        for ingredient, amount in amounts.items():
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=ingredient, amount=amount
+            )
+        return recipe
+
+    def plan(self, *items):
+        return self.client.post(URL, {'recipes': [
+            {'id': pk, 'servings': servings} for pk, servings in items
+        ]}, format='json')
+
+    def amounts(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {item['name']: item['amount']
+                for item in response.data['ingredients']}
+
+    def test_amounts_are_scaled_by_servings(self):
+        response = self.plan((self.soup.pk, 2.5))
+
+        self.assertEqual(self.amounts(response), {'сахар': 12.5, 'соль': 25})
+        self.assertEqual(response.data['missing'], [])
+
+    def test_repeated_recipes_and_ingredients_are_merged(self):
+        response = self.plan((self.soup.pk, 1), (self.cake.pk, 1),
+                             (self.soup.pk, 2))
+
+        self.assertEqual(self.amounts(response), {'сахар': 115, 'соль': 30})
+        self.assertEqual(
+            [item['name'] for item in response.data['ingredients']],
+            ['сахар', 'соль'],
+        )
+
+    def test_unknown_and_hidden_recipes_are_missing(self):
+        hidden = User.objects.create_user(
+            username='hidden', email='hidden@example.com', password='pass',
+            first_name='Hidden', last_name='Hidden',
+            deleted_at=timezone.now(), is_active=False,
+        )
+        hidden_recipe = self.create_recipe('Скрытый', {self.salt: 1}, hidden)
+
+        response = self.plan((self.soup.pk, 1), (hidden_recipe.pk, 1),
+                             (999999, 1))
+
+        self.assertEqual(self.amounts(response), {'сахар': 5, 'соль': 10})
+        self.assertEqual(response.data['missing'],
+                         sorted([hidden_recipe.pk, 999999]))
+
+    def test_invalid_plan_is_rejected(self):
+        for recipes in ([], [{'id': self.soup.pk, 'servings': 0}],
+                        [{'id': self.soup.pk, 'servings': 101}]):
+            with self.subTest(recipes):
+                response = self.client.post(URL, {'recipes': recipes},
+                                            format='json')
+                self.assertEqual(response.status_code,
+                                 status.HTTP_400_BAD_REQUEST)
+
+    def test_edited_ingredients_invalidate_cached_plan(self):
+        self.assertEqual(self.amounts(self.plan((self.soup.pk, 2))),
+                         {'сахар': 10, 'соль': 20})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.amounts(self.plan((self.soup.pk, 2))),
+                             {'сахар': 10, 'соль': 20})
+
+        self.client.force_authenticate(self.author)
+        response = self.client.patch(
+            f'/api/recipes/{self.soup.pk}/',
+            {'ingredients': [{'id': self.salt.pk, 'amount': 3}]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(None)
+
+        self.assertEqual(self.amounts(self.plan((self.soup.pk, 2))),
+                         {'соль': 6})
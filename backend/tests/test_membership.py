@@ -0,0 +1,50 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from foodgram import membership
+from recipes.models import FavoriteRecipe, Recipe
+from users.models import User
+
+
+class MembershipIndexTests(TestCase):
+
+    def setUp(self):
+        membership.favorites.sets.clear()
+        self.user = User.objects.create_user(
+            username='reader', email='reader@example.com', password='pass',
+            first_name='Reader', last_name='Reader',
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user, name='Борщ', text='Сварить.',
+            cooking_time=60, image='recipes/borsch.png',
+        )
+
+    def _favorite_elsewhere(self):
+        # bulk_create не отправляет сигналов и событий, как и запись,
+        # сделанная другим воркером с отдельным кэшем в памяти
+        FavoriteRecipe.objects.bulk_create(
+            [FavoriteRecipe(user=self.user, recipe=self.recipe)]
+        )
+
+    def test_process_local_cache_reads_database(self):
+        self.assertNotIn(self.recipe.pk,
+                         membership.favorites.get(self.user.pk))
+
+        self._favorite_elsewhere()
+
+        self.assertIn(self.recipe.pk, membership.favorites.get(self.user.pk))
+        self.assertIsNone(membership.favorites.sets.get(self.user.pk))
+
+    def test_shared_cache_keeps_sets(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        shared = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        }}
+        with override_settings(CACHES=shared):
+            membership.favorites.get(self.user.pk)
+
+            self.assertIsNotNone(membership.favorites.sets.get(self.user.pk))
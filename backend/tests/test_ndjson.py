@@ -0,0 +1,67 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.ndjson import RecipeImporter, export_recipes
+from users.models import User
+
+# Прозрачный PNG 1x1
+TINY_PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c63606060f80f0001040100a5f5e6b0'
+    '0000000049454e44ae426082'
+)
+
+
+class RecipeTransferTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass',
+            first_name='Author', last_name='Author',
+        )
+        salt = Ingredient.objects.create(name='соль', measurement_unit='г')
+        self.image = default_storage.save(
+            'recipes/photo.png', ContentFile(TINY_PNG)
+        )
+        recipe = Recipe.objects.create(
+            author=self.author, name='Борщ', text='Сварить.',
+            cooking_time=60, image=self.image,
+        )
+        RecipeIngredient.objects.create(
+            recipe=recipe, ingredient=salt, amount=5
+        )
+
+    def _round_trip(self, media_dir):
+        output = io.StringIO()
+        export_recipes(output, chunk_size=10)
+        importer = RecipeImporter(chunk_size=10, media_dir=media_dir)
+        importer.run(output.getvalue().splitlines())
+        return Recipe.objects.order_by('-pk').first()
+
+    def test_import_keeps_image_name(self):
+        imported = self._round_trip(self.media_root)
+
+        self.assertEqual(imported.image.name, self.image)
+
+    def test_import_into_empty_storage_keeps_image_name(self):
+        source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source)
+        shutil.copytree(self.media_root, source, dirs_exist_ok=True)
+        shutil.rmtree(self.media_root)
+
+        imported = self._round_trip(source)
+
+        self.assertEqual(imported.image.name, self.image)
+        self.assertTrue(default_storage.exists(self.image))
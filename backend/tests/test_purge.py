@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.db.models.signals import pre_delete
+from django.test import TestCase
+from django.utils import timezone
+
+from recipes.models import (FavoriteRecipe, Ingredient, Recipe,
+                            RecipeIngredient, ShoppingList,
+                            ShoppingListArchive)
+from users.jobs import purge
+from users.models import User
+
+
+class PurgeTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass',
+            first_name='Author', last_name='Author',
+            deleted_at=timezone.now(), is_active=False,
+        )
+        self.readers = [
+            User.objects.create_user(
+                username=f'reader{index}', email=f'reader{index}@example.com',
+                password='pass', first_name='Reader', last_name='Reader',
+            )
+            for index in range(3)
+        ]
+        salt = Ingredient.objects.create(name='соль', measurement_unit='г')
+        self.recipes = [
+            Recipe.objects.create(
+                author=self.author, name=f'Рецепт {index}', text='Сварить.',
+                cooking_time=10,
+            )
+            for index in range(5)
+        ]
+        for recipe in self.recipes:
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=salt, amount=1
+            )
+            for reader in self.readers:
+                FavoriteRecipe.objects.create(user=reader, recipe=recipe)
+                ShoppingList.objects.create(user=reader, recipe=recipe)
+                ShoppingListArchive.objects.create(user=reader, recipe=recipe)
+        self.other = Recipe.objects.create(
+            author=self.readers[0], name='Чужой', text='Сварить.',
+            cooking_time=10,
+        )
+        FavoriteRecipe.objects.create(user=self.readers[1], recipe=self.other)
+
+    def test_dependent_rows_are_deleted_before_recipes(self):
+        cascaded = []
+
+        def check_dependents(sender, instance, **kwargs):
+            for model in (FavoriteRecipe, ShoppingList, ShoppingListArchive,
+                          RecipeIngredient):
+                if model.objects.filter(recipe=instance).exists():
+                    cascaded.append((model.__name__, instance.pk))
+
+        pre_delete.connect(check_dependents, sender=Recipe)
+        self.addCleanup(pre_delete.disconnect, check_dependents, sender=Recipe)
+        with mock.patch('users.jobs.USER_PURGE_BATCH_SIZE', 2):
+            purge(self.author.pk)
+
+        self.assertEqual(cascaded, [])
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertEqual(list(Recipe.objects.all()), [self.other])
+        self.assertEqual(
+            list(FavoriteRecipe.objects.values_list('user', 'recipe')),
+            [(self.readers[1].pk, self.other.pk)],
+        )
+        self.assertFalse(ShoppingList.objects.exists())
+        self.assertFalse(ShoppingListArchive.objects.exists())
+        self.assertFalse(RecipeIngredient.objects.exists())
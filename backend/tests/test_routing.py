@@ -0,0 +1,64 @@
+import time
+
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from foodgram.db.routing import STICKY_COOKIE
+from recipes.models import Ingredient
+from users.models import User
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(APITestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        # Одинаковый id и разные названия показывают, из какой базы
+        # прочитан ингредиент
+        self.url = '/api/ingredients/{}/'.format(
+            Ingredient.objects.create(name='соль', measurement_unit='г').pk
+        )
+        Ingredient.objects.using('replica').create(
+            pk=Ingredient.objects.get().pk, name='перец', measurement_unit='г'
+        )
+
+    def test_read_goes_to_replica(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.json()['name'], 'перец')
+
+    def test_write_goes_to_primary(self):
+        response = self.client.post('/api/users/', {
+            'email': 'writer@example.com', 'username': 'writer',
+            'first_name': 'Writer', 'last_name': 'Writer',
+            'password': 'Wr1ter-pass',
+        })
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(User.objects.using('default').filter(
+            username='writer'
+        ).exists())
+        self.assertFalse(User.objects.using('replica').filter(
+            username='writer'
+        ).exists())
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+    def test_sticky_cookie_reads_primary(self):
+        self.client.cookies[STICKY_COOKIE] = str(int(time.time()) + 60)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.json()['name'], 'соль')
+
+    def test_expired_cookie_reads_replica(self):
+        self.client.cookies[STICKY_COOKIE] = str(int(time.time()) - 1)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.json()['name'], 'перец')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_reads_primary(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.json()['name'], 'соль')
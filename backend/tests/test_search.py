@@ -0,0 +1,171 @@
+import random
+
+from django.test import SimpleTestCase, TransactionTestCase
+
+from foodgram import events
+from recipes import search
+from recipes.models import Ingredient
+
+NAMES = (
+    'молоко', 'Молоко сгущенное', 'молока', 'мука', 'мясо', 'картофель',
+    'Ёжевика', 'кокос',
+)
+
+
+class FuzzySearchTests(SimpleTestCase):
+
+    def setUp(self):
+        self.index = search.IngredientIndex()
+        self.index.build(enumerate(NAMES, 1))
+
+    def search(self, query, limit=20):
+        return [NAMES[pk - 1] for pk in self.index.search(query, limit)]
+
+    def test_typo_limits_depend_on_query_length(self):
+        self.assertEqual(search.max_distance('мук'), 0)
+        self.assertEqual(search.max_distance('мука'), 1)
+        self.assertEqual(search.max_distance('молочко'), 1)
+        self.assertEqual(search.max_distance('картошка'), 2)
+
+    def test_one_typo(self):
+        self.assertEqual(self.search('мяса'), ['мясо'])
+        self.assertEqual(self.search('мкуа'), [])
+
+    def test_two_typos_only_for_long_queries(self):
+        self.assertEqual(self.search('картафелл'), ['картофель'])
+        # Четыре символа — не больше одной опечатки
+        self.assertEqual(self.search('мысу'), [])
+
+    def test_first_letter_must_match(self):
+        self.assertEqual(self.search('малоко'), ['молоко', 'Молоко сгущенное'])
+        self.assertEqual(self.search('волоко'), [])
+
+    def test_ranking(self):
+        # Сначала расстояние до начала названия, затем до всего названия,
+        # затем алфавит
+        self.assertEqual(
+            self.search('молоко'),
+            ['молоко', 'Молоко сгущенное', 'молока'],
+        )
+        self.assertEqual(
+            self.search('молако'), ['молоко', 'Молоко сгущенное']
+        )
+        self.index.build([(1, 'бобы'), (2, 'бабы'), (3, 'бублик')])
+        # Одна опечатка до начала у всех; целиком совпадают «бабы» и
+        # «бобы», и между ними решает алфавит
+        self.assertEqual(self.index.search('бубы', 20), [2, 1, 3])
+
+    def test_limit(self):
+        self.assertEqual(self.search('молоко', limit=2),
+                         ['молоко', 'Молоко сгущенное'])
+
+    def test_yo_and_case_are_normalized(self):
+        self.assertEqual(self.search('ЕЖЕВИКА'), ['Ёжевика'])
+        self.assertEqual(self.search('ёживика'), ['Ёжевика'])
+
+    def test_same_normalized_name_keeps_all_ids(self):
+        self.index.build([(1, 'Соль'), (2, 'соль'), (3, 'сода')])
+
+        self.assertEqual(sorted(self.index.search('соль', 20)), [1, 2])
+
+
+def levenshtein(first, second):
+    row = list(range(len(second) + 1))
+    for index, char in enumerate(first, 1):
+        previous, row[0] = row[0], index
+        for column, other in enumerate(second, 1):
+            previous, row[column] = row[column], min(
+                row[column] + 1, row[column - 1] + 1,
+                previous + (char != other),
+            )
+    return row[-1]
+
+
+def brute_force(names, query, limit):
+    """Та же выдача полным перебором: без дерева и отсечений."""
+    query = search.normalize(query)
+    distance = search.max_distance(query)
+    missed = distance + 1
+    found = {}
+    for name in {search.normalize(name) for name in names}:
+        if name[:1] != query[:1]:
+            continue
+        prefix = min(levenshtein(query, name[:end])
+                     for end in range(1, len(name) + 1))
+        if prefix > distance:
+            continue
+        full = levenshtein(query, name)
+        found[name] = (prefix, full if full <= distance else missed)
+    return sorted(found, key=lambda name: (*found[name], name))[:limit]
+
+
+class FuzzySearchBruteForceTests(SimpleTestCase):
+
+    def test_matches_brute_force(self):
+        generator = random.Random(7)
+        names = sorted({
+            search.normalize(''.join(generator.choice('абвео ') for _ in range(
+                generator.randint(1, 10)
+            ))) or 'а'
+            for _ in range(400)
+        })
+        index = search.IngredientIndex()
+        index.build(enumerate(names))
+        for _ in range(300):
+            query = ''.join(generator.choice('абвео')
+                            for _ in range(generator.randint(4, 9)))
+            with self.subTest(query):
+                self.assertEqual(
+                    [search.normalize(names[pk])
+                     for pk in index.search(query, len(names))],
+                    brute_force(names, query, len(names)),
+                )
+
+
+class IngredientIndexEventsTests(TransactionTestCase):
+    # Индекс обновляется подписчиком событий после настоящего COMMIT
+
+    def setUp(self):
+        self.milk = Ingredient.objects.create(
+            name='молоко', measurement_unit='мл'
+        )
+        self.flour = Ingredient.objects.create(
+            name='мука', measurement_unit='г'
+        )
+        search.ingredients.build()
+        self.addCleanup(search.ingredients.reset)
+
+    def test_renamed_ingredient(self):
+        self.milk.name = 'кефир'
+        self.milk.save()
+
+        self.assertEqual(search.ingredients.search('молако', 20), [])
+        self.assertEqual(search.ingredients.search('кефер', 20),
+                         [self.milk.pk])
+
+    def test_deleted_ingredient(self):
+        self.flour.delete()
+
+        self.assertEqual(search.ingredients.search('мукка', 20), [])
+        self.assertIn('молоко', search.ingredients.names)
+
+    def test_added_ingredient(self):
+        salt = Ingredient.objects.create(name='соль', measurement_unit='г')
+
+        self.assertEqual(search.ingredients.search('сольь', 20), [salt.pk])
+        self.assertEqual(search.ingredients.names, ['молоко', 'мука', 'соль'])
+
+    def test_api_fuzzy_filter(self):
+        response = self.client.get(
+            '/api/ingredients/', {'name': 'малоко', 'fuzzy': 'true'}
+        )
+
+        self.assertEqual([item['id'] for item in response.json()],
+                         [self.milk.pk])
+
+    def test_bulk_change_resets_index(self):
+        events.publish(events.INGREDIENT)
+
+        self.assertIsNone(search.ingredients.names)
+        self.assertEqual(search.ingredients.search('молако', 20),
+                         [self.milk.pk])
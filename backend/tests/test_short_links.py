@@ -0,0 +1,47 @@
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from recipes import shortlinks
+from recipes.models import Recipe
+from users.models import User
+
+
+class ShortLinkTests(APITransactionTestCase):
+    # События об изменениях рассылаются только после настоящего COMMIT
+
+    def setUp(self):
+        shortlinks.targets.clear()
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass',
+            first_name='Author', last_name='Author',
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.author, name='Борщ', text='Сварить.',
+            cooking_time=60, image='recipes/borsch.png',
+        )
+        self.url = f'/s/{shortlinks.encode(self.recipe.pk)}/'
+
+    def test_only_canonical_code_is_accepted(self):
+        code = shortlinks.encode(self.recipe.pk)
+
+        for alias in (f'0{code}', f'00{code}'):
+            with self.subTest(alias):
+                self.assertEqual(self.client.get(f'/s/{alias}/').status_code,
+                                 status.HTTP_404_NOT_FOUND)
+                with self.assertRaises(ValueError):
+                    shortlinks.decode(alias)
+        self.assertEqual(shortlinks.decode('0'), 0)
+        self.assertEqual(shortlinks.decode(code), self.recipe.pk)
+
+    def test_deleted_account_hides_cached_link(self):
+        self.assertEqual(self.client.get(self.url).status_code,
+                         status.HTTP_302_FOUND)
+
+        self.client.force_authenticate(self.author)
+        response = self.client.delete(
+            f'/api/users/{self.author.id}/', {'current_password': 'pass'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertEqual(self.client.get(self.url).status_code,
+                         status.HTTP_404_NOT_FOUND)
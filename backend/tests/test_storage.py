@@ -0,0 +1,203 @@
+import base64
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from foodgram.storage import delete_unreferenced, is_recently_used
+from jobs.models import Job
+from recipes.jobs import delete_files
+from recipes.models import Ingredient, Recipe
+from users.models import User
+
+
+def png(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (1, 1), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def data_url(content):
+    return 'data:image/png;base64,' + base64.b64encode(content).decode()
+
+
+class MediaRootMixin:
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def save(self, name, content, age=3600):
+        """Сохраняет файл так, будто это было age секунд назад."""
+        name = default_storage.save(name, ContentFile(content))
+        self.age(name, age)
+        return name
+
+    def age(self, name, seconds):
+        path = default_storage.path(name)
+        modified = os.path.getmtime(path) - seconds
+        os.utime(path, (modified, modified))
+
+    def run_delete_jobs(self):
+        jobs = list(Job.objects.filter(name='recipes.delete_files'))
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+        for job in jobs:
+            delete_files(**job.payload)
+
+
+class ContentAddressedStorageTests(MediaRootMixin, TestCase):
+
+    def test_same_content_is_stored_once(self):
+        first = default_storage.save('recipes/a.png', ContentFile(png('red')))
+        second = default_storage.save('recipes/b.PNG', ContentFile(png('red')))
+        other = default_storage.save('recipes/c.png', ContentFile(png('blue')))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertRegex(first, r'^recipes/([0-9a-f]{2})/\1[0-9a-f]{62}\.png$')
+        self.assertEqual(len(os.listdir(os.path.dirname(
+            default_storage.path(first)
+        ))), 1)
+
+    def test_saving_existing_file_marks_it_as_used(self):
+        name = self.save('recipes/a.png', png('red'))
+        self.assertFalse(is_recently_used(name))
+
+        default_storage.save('recipes/a.png', ContentFile(png('red')))
+
+        self.assertTrue(is_recently_used(name))
+
+    def test_file_deleted_during_save_is_written_again(self):
+        name = self.save('recipes/a.png', png('red'))
+
+        def deleted(path, *args):
+            os.remove(path)
+            raise FileNotFoundError(path)
+
+        with mock.patch('foodgram.storage.os.utime', side_effect=deleted):
+            saved = default_storage.save(
+                'recipes/a.png', ContentFile(png('red'))
+            )
+
+        self.assertEqual(saved, name)
+        self.assertTrue(default_storage.exists(name))
+
+    def test_unreferenced_file_is_deleted(self):
+        name = self.save('recipes/a.png', png('red'))
+
+        self.assertTrue(delete_unreferenced(name))
+        self.assertFalse(default_storage.exists(name))
+
+    def test_referenced_file_is_kept(self):
+        name = self.save('users/a.png', png('red'))
+        User.objects.create_user(
+            username='owner', email='owner@example.com', password='pass',
+            first_name='Owner', last_name='Owner', avatar=name,
+        )
+
+        self.assertTrue(delete_unreferenced(name))
+        self.assertTrue(default_storage.exists(name))
+
+    def test_recently_saved_file_is_postponed(self):
+        name = self.save('recipes/a.png', png('red'), age=0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_files([name])
+
+        self.assertTrue(default_storage.exists(name))
+        job = Job.objects.get(name='recipes.delete_files')
+        self.assertEqual(job.payload, {'names': [name]})
+        self.assertGreater(job.run_at, job.created_at)
+
+
+class ReplacedFilesTests(MediaRootMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(
+            username='owner', email='owner@example.com', password='pass',
+            first_name='Owner', last_name='Owner',
+        )
+        self.client.force_authenticate(self.user)
+        self.salt = Ingredient.objects.create(name='соль', measurement_unit='г')
+        self.old = self.save('recipes/old.png', png('red'))
+        self.recipe = Recipe.objects.create(
+            author=self.user, name='Борщ', text='Сварить.',
+            cooking_time=60, image=self.old,
+        )
+
+    def update_recipe_image(self, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f'/api/recipes/{self.recipe.pk}/',
+                {'image': data_url(content),
+                 'ingredients': [{'id': self.salt.pk, 'amount': 1}]},
+                format='json',
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.run_delete_jobs()
+
+    def test_replaced_recipe_image_is_deleted(self):
+        self.update_recipe_image(png('blue'))
+
+        self.recipe.refresh_from_db()
+        self.assertFalse(default_storage.exists(self.old))
+        self.assertTrue(default_storage.exists(self.recipe.image.name))
+
+    def test_replaced_recipe_image_shared_with_avatar_is_kept(self):
+        self.user.avatar = self.old
+        self.user.save()
+
+        self.update_recipe_image(png('blue'))
+
+        self.assertTrue(default_storage.exists(self.old))
+
+    def test_same_recipe_image_is_not_deleted(self):
+        self.update_recipe_image(png('red'))
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image.name, self.old)
+        self.assertFalse(Job.objects.exists())
+        self.assertTrue(default_storage.exists(self.old))
+
+    def test_replaced_avatar_is_deleted(self):
+        old_avatar = self.save('users/old.png', png('green'))
+        self.user.avatar = old_avatar
+        self.user.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                '/api/users/me/avatar/', {'avatar': data_url(png('blue'))},
+                format='json',
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.run_delete_jobs()
+
+        self.user.refresh_from_db()
+        self.assertFalse(default_storage.exists(old_avatar))
+        self.assertTrue(default_storage.exists(self.user.avatar.name))
+
+    def test_replaced_avatar_shared_with_recipe_is_kept(self):
+        self.user.avatar = self.old
+        self.user.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                '/api/users/me/avatar/', {'avatar': data_url(png('blue'))},
+                format='json',
+            )
+        self.run_delete_jobs()
+
+        self.assertTrue(default_storage.exists(self.old))
@@ -0,0 +1,43 @@
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users.models import Follow, User
+
+
+class SubscribeTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='reader', email='reader@example.com', password='pass',
+            first_name='Reader', last_name='Reader',
+        )
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass',
+            first_name='Author', last_name='Author',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_cannot_subscribe_to_self(self):
+        response = self.client.post(f'/api/users/{self.user.id}/subscribe/')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data['non_field_errors'],
+            ['Нельзя подписаться на самого себя.']
+        )
+        self.assertFalse(Follow.objects.exists())
+
+    def test_cannot_subscribe_twice(self):
+        url = f'/api/users/{self.author.id}/subscribe/'
+        self.assertEqual(
+            self.client.post(url).status_code, status.HTTP_201_CREATED
+        )
+
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data['non_field_errors'],
+            ['Вы уже подписаны на этого пользователя.']
+        )
+        self.assertEqual(Follow.objects.count(), 1)
@@ -0,0 +1,121 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.throttling import TokenBucketStore, local_buckets, refill
+from users.models import User
+
+RATES = {'anon': '2/min', 'user': '100/min', 'subscriptions': '2/min'}
+
+
+class TokenBucketTests(SimpleTestCase):
+
+    def test_burst_up_to_capacity(self):
+        state = None
+        for _ in range(3):
+            state, wait = refill(state, 3, 1, now=100)
+            self.assertEqual(wait, 0)
+
+        state, wait = refill(state, 3, 1, now=100)
+
+        self.assertEqual(wait, 1)
+
+    def test_refill_over_time(self):
+        state = (0, 100)
+
+        _, wait = refill(state, 3, 0.5, now=101)
+        self.assertEqual(wait, 1)
+
+        state, wait = refill(state, 3, 0.5, now=102)
+        self.assertEqual(wait, 0)
+        self.assertEqual(state, (0, 102))
+
+    def test_refill_is_capped_by_capacity(self):
+        state, _ = refill((0, 0), 3, 1, now=1000)
+
+        self.assertEqual(state, (2, 1000))
+
+    def test_store_keeps_buckets_per_key(self):
+        store = TokenBucketStore(max_size=10)
+        with mock.patch('api.throttling.time.monotonic', return_value=50):
+            self.assertEqual(store.consume('a', 1, 1), 0)
+            self.assertEqual(store.consume('b', 1, 1), 0)
+            self.assertEqual(store.consume('a', 1, 1), 1)
+
+    def test_store_evicts_least_recently_used(self):
+        store = TokenBucketStore(max_size=1)
+        with mock.patch('api.throttling.time.monotonic', return_value=50):
+            store.consume('a', 1, 1)
+            store.consume('b', 1, 1)
+
+            self.assertEqual(store.consume('a', 1, 1), 0)
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': RATES,
+})
+class ThrottleTests(APITestCase):
+
+    def setUp(self):
+        local_buckets.clear()
+        self.addCleanup(local_buckets.clear)
+
+    def get_recipes(self, client_ip):
+        # Так запрос приходит от nginx: REMOTE_ADDR — адрес прокси
+        return self.client.get(
+            '/api/recipes/',
+            REMOTE_ADDR='172.18.0.5',
+            HTTP_X_FORWARDED_FOR=client_ip,
+        )
+
+    def test_exhausted_bucket_returns_429_with_retry_after(self):
+        for _ in range(2):
+            self.assertEqual(self.get_recipes('203.0.113.1').status_code,
+                             status.HTTP_200_OK)
+
+        response = self.get_recipes('203.0.113.1')
+
+        self.assertEqual(response.status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+
+    def test_anonymous_clients_behind_proxy_have_own_buckets(self):
+        for _ in range(2):
+            self.get_recipes('203.0.113.1')
+
+        self.assertEqual(self.get_recipes('203.0.113.2').status_code,
+                         status.HTTP_200_OK)
+        self.assertEqual(self.get_recipes('203.0.113.1').status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_spoofed_forwarded_for_is_ignored(self):
+        # nginx дописывает настоящий адрес клиента в конец цепочки
+        for fake in ('198.51.100.1', '198.51.100.2'):
+            self.get_recipes(f'{fake}, 203.0.113.1')
+
+        self.assertEqual(
+            self.get_recipes('198.51.100.3, 203.0.113.1').status_code,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+
+    def test_scoped_limit_does_not_spend_user_bucket(self):
+        user = User.objects.create_user(
+            username='reader', email='reader@example.com', password='pass',
+            first_name='Reader', last_name='Reader',
+        )
+        self.client.force_authenticate(user)
+        for _ in range(2):
+            self.assertEqual(
+                self.client.get('/api/users/subscriptions/').status_code,
+                status.HTTP_200_OK,
+            )
+
+        self.assertEqual(
+            self.client.get('/api/users/subscriptions/').status_code,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+        self.assertEqual(self.client.get('/api/users/me/').status_code,
+                         status.HTTP_200_OK)
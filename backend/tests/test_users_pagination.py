@@ -0,0 +1,66 @@
+from unittest import mock
+
+from rest_framework.test import APITestCase
+
+from foodgram.db.estimates import planner_count
+from users.models import User
+
+
+class UsersPaginationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(5):
+            User.objects.create_user(
+                username=f'user{number}', email=f'user{number}@example.com',
+                password='pass', first_name='User', last_name='User',
+            )
+
+    def get_page(self, page, estimate):
+        with mock.patch('api.pagination.planner_count',
+                        return_value=estimate), \
+                mock.patch('api.pagination.'
+                           'PAGINATION_ESTIMATED_COUNT_THRESHOLD', 2):
+            return self.client.get(
+                '/api/users/', {'page': page, 'page_size': 2}
+            )
+
+    def usernames(self, response):
+        return [user['username'] for user in response.data['results']]
+
+    def test_small_list_is_counted_exactly(self):
+        response = self.get_page(1, 2)
+
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(response.data['total_pages'], 3)
+
+    def test_large_list_uses_estimate(self):
+        response = self.get_page(1, 1000)
+
+        self.assertEqual(response.data['count'], 1000)
+        self.assertEqual(response.data['total_pages'], 500)
+        self.assertEqual(self.usernames(response), ['user0', 'user1'])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_underestimated_pages_are_served(self):
+        response = self.get_page(2, 3)
+
+        self.assertEqual(self.usernames(response), ['user2', 'user3'])
+
+        response = self.get_page(3, 3)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.usernames(response), ['user4'])
+
+    def test_overestimated_pages_are_empty(self):
+        response = self.get_page(10, 1000)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+
+    def test_invalid_page_is_rejected(self):
+        self.assertEqual(self.get_page(0, 1000).status_code, 404)
+        self.assertEqual(self.get_page('x', 1000).status_code, 404)
+
+    def test_no_estimate_outside_postgresql(self):
+        self.assertIsNone(planner_count(User.objects.all()))
@@ -2,11 +2,15 @@ from django.contrib import admin
 from django.contrib.admin import register
 from django.contrib.auth.admin import UserAdmin
 
-from .models import User
+from foodgram.admin import LargeTableAdminMixin
+from foodgram.db.expressions import count_subquery
+from recipes.models import Recipe
+from .jobs import delete_account
+from .models import Follow, User
 
 
 @register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(LargeTableAdminMixin, UserAdmin):
     list_display = (
         "id",
         "username",
@@ -18,22 +22,37 @@ class CustomUserAdmin(UserAdmin):
         "authored_recipes_amount",
         "followers_amount",
     )
-    list_filter = ("username", "email")
+    list_filter = ("is_staff", "is_active", ("deleted_at", admin.EmptyFieldListFilter))
     search_fields = ("username__icontains", "email__icontains")
+    readonly_fields = ("deleted_at",)
 
-    @admin.display(description="Авторских рецептов")
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            recipes_total=count_subquery(Recipe.objects.all(), "author"),
+            followers_total=count_subquery(Follow.objects.all(), "author"),
+        )
+
+    def delete_model(self, request, obj):
+        # Данные пользователя удаляет фоновая задача
+        delete_account(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset.filter(deleted_at__isnull=True):
+            delete_account(user)
+
+    @admin.display(description="Авторских рецептов", ordering="recipes_total")
     def authored_recipes_amount(self, user_instance):
-        return user_instance.authored_recipes.count()
+        return user_instance.recipes_total
 
-    @admin.display(description="Подписчиков")
+    @admin.display(description="Подписчиков", ordering="followers_total")
     def followers_amount(self, user_instance):
-        return user_instance.creator_subscriptions.count()
+        return user_instance.followers_total
 
     fieldsets = (
-        (None, {"fields": ("username", "hashed_password")}),
+        (None, {"fields": ("username", "password")}),
         ("Персональная информация", {
          "fields": ("first_name", "last_name", "email")}),
-        ("Дополнительно", {"fields": ("avatar",)}),
+        ("Дополнительно", {"fields": ("avatar", "deleted_at")}),
     )
     add_fieldsets = (
         (None, {
@@ -5,3 +5,9 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
     verbose_name = "Пользователи"
+
+    def ready(self):
+        from foodgram import events
+
+        events.track("users.Follow", events.FOLLOW, "follower_id")
+        events.track_field("users.User", "avatar", events.USER_AVATAR)
@@ -0,0 +1,98 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from foodgram import events
+from foodgram.constants import USER_PURGE_BATCH_SIZE
+from jobs.registry import enqueue, job, set_progress
+from recipes.jobs import delete_files_later
+from recipes.models import (FavoriteRecipe, Recipe, RecipeIngredient,
+                            ShoppingList, ShoppingListArchive)
+from users.models import Follow, User
+
+
+def delete_account(user):
+    """Скрывает аккаунт сразу и ставит удаление его данных в очередь.
+
+    Пользователь деактивируется, его токены отзываются, а он сам и его
+    рецепты пропадают из выдачи. Строки удаляет задача users.purge.
+    """
+    with transaction.atomic():
+        user.is_active = False
+        user.deleted_at = timezone.now()
+        user.save(update_fields=("is_active", "deleted_at"))
+        Token.objects.filter(user=user).delete()
+        enqueue(
+            "users.purge",
+            {"user_id": user.pk},
+            idempotency_key=f"users.purge:{user.pk}",
+        )
+        # Рецепты скрытого автора выпадают из планов питания и перестают
+        # открываться по коротким ссылкам, закэшированным в воркерах
+        events.publish(events.USER, user.pk)
+        events.publish(
+            events.RECIPE,
+            *Recipe.objects.filter(author=user).values_list("pk", flat=True),
+        )
+
+
+def _delete_in_batches(queryset, progress_key):
+    """Удаляет строки порциями, каждую в своей короткой транзакции."""
+    done = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                queryset.order_by("pk").values_list("pk", flat=True)[
+                    :USER_PURGE_BATCH_SIZE
+                ]
+            )
+            if not ids:
+                return
+            # Файлы рецептов удаляются после фиксации каждой порции
+            # обработчиком post_delete
+            queryset.model.objects.filter(pk__in=ids).delete()
+        done += len(ids)
+        set_progress(**{progress_key: done})
+
+
+@job("users.purge", max_attempts=10)
+def purge(user_id):
+    """Удаляет данные аккаунта порциями, затем сам аккаунт.
+
+    Задача идемпотентна: после сбоя она продолжит с оставшихся строк.
+    """
+    user = User.objects.filter(pk=user_id, deleted_at__isnull=False).first()
+    if user is None:
+        return
+    set_progress(total_recipes=user.recipes.count())
+    _delete_in_batches(
+        Follow.objects.filter(follower=user) | Follow.objects.filter(author=user),
+        "follows",
+    )
+    _delete_in_batches(FavoriteRecipe.objects.filter(user=user), "favorites")
+    _delete_in_batches(ShoppingList.objects.filter(user=user), "shopping_cart")
+    _delete_in_batches(
+        ShoppingListArchive.objects.filter(user=user), "shopping_cart_archive"
+    )
+    # Строки других пользователей, ссылающиеся на рецепты автора, иначе
+    # удалились бы каскадом целиком в транзакции одной порции рецептов
+    _delete_in_batches(
+        FavoriteRecipe.objects.filter(recipe__author=user), "recipe_favorites"
+    )
+    _delete_in_batches(
+        ShoppingList.objects.filter(recipe__author=user),
+        "recipe_shopping_cart",
+    )
+    _delete_in_batches(
+        ShoppingListArchive.objects.filter(recipe__author=user),
+        "recipe_shopping_cart_archive",
+    )
+    _delete_in_batches(
+        RecipeIngredient.objects.filter(recipe__author=user),
+        "recipe_ingredients",
+    )
+    _delete_in_batches(Recipe.objects.filter(author=user), "recipes")
+    with transaction.atomic():
+        delete_files_later(user.avatar.name)
+        user.delete()
+    set_progress(finished=True)
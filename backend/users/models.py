@@ -33,6 +33,13 @@ class User(AbstractUser):
         verbose_name="Фото профиля",
         upload_to=USER_AVATAR_STORAGE_PATH,
         blank=True,
+        db_index=True,
+    )
+    # Аккаунт скрыт сразу, а связанные данные удаляются фоновой задачей
+    deleted_at = models.DateTimeField(
+        verbose_name="Удалён",
+        null=True,
+        blank=True,
     )
     groups = models.ManyToManyField(
         Group,
@@ -1,36 +1,64 @@
 from rest_framework import serializers
 
 from api.serializers import UserReadSerializer
+from foodgram.constants import (SUBSCRIPTION_RECIPES_LIMIT_DEFAULT,
+                                SUBSCRIPTION_RECIPES_LIMIT_MAX)
 from recipes.serializers import RecipeMinifiedSerializer
 from users.models import Follow
 
 
+def get_recipes_limit(request):
+    """Число рецептов автора в ответе из параметра recipes_limit.
+
+    Без параметра используется значение по умолчанию, большие значения
+    ограничиваются сверху, некорректные дают ошибку 400.
+    """
+    value = request.query_params.get('recipes_limit') if request else None
+    if value in (None, ''):
+        return SUBSCRIPTION_RECIPES_LIMIT_DEFAULT
+    if not value.isdigit():
+        raise serializers.ValidationError({
+            'recipes_limit': 'Укажите неотрицательное целое число.'
+        })
+    return min(int(value), SUBSCRIPTION_RECIPES_LIMIT_MAX)
+
+
 class UserWithRecipesSerializer(UserReadSerializer):
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.IntegerField(source="recipes.count", read_only=True)
+    recipes_count = serializers.SerializerMethodField()
 
     class Meta(UserReadSerializer.Meta):
         fields = (*UserReadSerializer.Meta.fields, 'recipes', 'recipes_count')
 
     def get_recipes(self, obj):
         request = self.context.get('request')
-        recipes_limit = request.query_params.get('recipes_limit')
-        queryset = obj.recipes.all()
+        # Рецепты страницы подписок загружаются одним запросом в представлении
+        if hasattr(obj, 'limited_recipes'):
+            queryset = obj.limited_recipes
+        else:
+            limit = self.context.get('recipes_limit')
+            if limit is None:
+                limit = get_recipes_limit(request)
+            queryset = obj.recipes.all()[:limit]
 
-        if recipes_limit and recipes_limit.isdigit():
-            queryset = queryset[:int(recipes_limit)]
-        
         return RecipeMinifiedSerializer(
             queryset,
             context={'request': request},
             many=True
         ).data
 
+    def get_recipes_count(self, obj):
+        if hasattr(obj, 'recipes_total'):
+            return obj.recipes_total
+        return obj.recipes.count()
+
 
 class SubscribeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Follow
         fields = ('author', 'follower')
+        # Повторную подписку проверяет validate() со своим сообщением
+        validators = []
 
     def to_representation(self, instance):
         # Возвращаем данные в формате UserWithRecipesSerializer
@@ -38,7 +66,7 @@ class SubscribeSerializer(serializers.ModelSerializer):
             instance.author,
             context=self.context
         ).data
-    
+
     def validate(self, attrs):
         follower = attrs['follower']
         author = attrs['author']
@@ -46,4 +74,4 @@ class SubscribeSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Нельзя подписаться на самого себя.')
         if Follow.objects.filter(follower=follower, author=author).exists():
             raise serializers.ValidationError('Вы уже подписаны на этого пользователя.')
-        return attrs
\ No newline at end of file
+        return attrs